@@ -0,0 +1,111 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import time
+import tracemalloc
+from tabulate import tabulate
+import final_task
+import new
+from lap_drivers import DriverRegistry
+from lap_fastparse import iter_lap_files, read_lap_times_fast
+from lap_stats import aggregate_laps, get_lap_counts, get_slowest_laps
+
+RACE_NAMES = ["Dewsbury", "Monza", "Silverstone", "Spa", "Suzuka"]
+
+def read_driver_codes(driver_file):
+    """Return the three-letter codes listed in the driver file."""
+    return list(final_task.read_driver_details(driver_file))
+
+def generate_lap_file(filename, lines, codes, seed=0):
+    """Write a lap time file in the spec format: race name, then one code plus time per line."""
+    rng = random.Random(seed)
+    with open(filename, "w") as file:
+        file.write(f"{rng.choice(RACE_NAMES)}\n")
+        batch = []
+        for _ in range(lines):
+            batch.append(f"{rng.choice(codes)}{rng.uniform(95.0, 125.0):.3f}\n")
+            if len(batch) >= 100000:
+                file.write("".join(batch))
+                batch.clear()
+        file.write("".join(batch))
+
+def get_lap_file(data_dir, lines, codes):
+    """Return a generated file with this many laps, reusing one from an earlier run if present."""
+    os.makedirs(data_dir, exist_ok=True)
+    filename = os.path.join(data_dir, f"laps_{lines}.txt")
+    if not os.path.exists(filename):
+        generate_lap_file(filename, lines, codes, seed=lines)
+    return filename
+
+def get_stages(driver_file, lap_file):
+    """Return the pipeline as (name, function) pairs. Each function takes and fills a shared context."""
+    def quiet(function, *args):
+        with contextlib.redirect_stdout(io.StringIO()):  # Measure rendering, not the terminal
+            function(*args)
+
+    return [
+        ("read_driver_details", lambda ctx: ctx.update(drivers=new.read_driver_details(driver_file))),
+        ("read_lap_times", lambda ctx: ctx.update(zip(("race_names", "lap_data"), new.read_lap_times([lap_file])))),
+        ("read_lap_times_fast", lambda ctx: read_lap_times_fast([lap_file])),
+        ("merge_driver_and_lap_data", lambda ctx: ctx.update(drivers=new.merge_driver_and_lap_data(ctx["drivers"], ctx["lap_data"]))),
+        ("driver_registry", lambda ctx: ctx.update(registry=DriverRegistry(driver_file).register_codes(ctx["lap_data"]))),
+        ("calculate_fastest_laps", lambda ctx: ctx.update(fastest_laps=new.calculate_fastest_laps(ctx["drivers"]))),
+        ("calculate_average_laps", lambda ctx: ctx.update(averages=new.calculate_average_laps(ctx["drivers"]))),
+        ("calculate_overall_average", lambda ctx: ctx.update(overall_avg=new.calculate_overall_average(ctx["lap_data"]))),
+        ("aggregate_laps", lambda ctx: ctx.update(summary=aggregate_laps(iter_lap_files([lap_file])))),
+        ("display_sorted_fastest_times", lambda ctx: quiet(new.display_sorted_fastest_times, ctx["fastest_laps"], ctx["registry"])),
+        ("display_results", lambda ctx: quiet(new.display_results, ctx["race_names"][-1], ctx["registry"],
+                                               ctx["fastest_laps"], ctx["averages"], ctx["overall_avg"])),
+        ("display_unique_data", lambda ctx: quiet(final_task.display_unique_data, ctx["registry"],
+                                                   get_lap_counts(ctx["summary"]), get_slowest_laps(ctx["summary"]))),
+    ]
+
+def run_benchmark(driver_file, lap_file, lines):
+    """Time each stage, then rerun it under tracemalloc for its peak memory."""
+    results = []
+    context = {}
+    for name, stage in get_stages(driver_file, lap_file):
+        started = time.perf_counter()
+        stage(context)
+        seconds = time.perf_counter() - started
+
+        # Tracing slows Python down a lot, so memory is measured on a separate run
+        tracemalloc.start()
+        stage(context)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({"lines": lines, "stage": name, "seconds": seconds,
+                        "lines_per_second": lines / seconds if seconds > 0 else None, "peak_bytes": peak})
+    return results
+
+def main():
+    # Get command-line arguments
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the lap timing pipeline on generated files.")
+    parser.add_argument("--driver-file", default="f1_drivers.txt")
+    parser.add_argument("--sizes", default="1e3,1e4,1e5,1e6", help="comma separated lap counts, e.g. 1e3,1e6,1e8")
+    parser.add_argument("--data-dir", default="bench_data", help="where generated lap files are kept between runs")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    codes = read_driver_codes(args.driver_file)
+    all_results = []
+    for size in args.sizes.split(","):
+        lines = int(float(size))
+        lap_file = get_lap_file(args.data_dir, lines, codes)
+        results = run_benchmark(args.driver_file, lap_file, lines)
+        all_results.extend(results)
+        print(f"{lines} laps ({os.path.getsize(lap_file)} bytes):")
+        table_data = [[r["stage"], r["seconds"], r["lines_per_second"], r["peak_bytes"] / 1024] for r in results]
+        print(tabulate(table_data, headers=["Stage", "Seconds", "Lines/s", "Peak KiB"], floatfmt=("", ".4f", ",.0f", ".1f")))
+        print("-" * 40)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(all_results, file, indent=2)
+
+# Main execution
+if __name__ == "__main__":
+    main()
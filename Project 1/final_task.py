@@ -1,3 +1,9 @@
+import sys
+from lap_index import build_race_index, get_race_names, get_latest_race
+from lap_profile import StageProfiler, parse_profile_argument
+from lap_drivers import DriverRegistry
+from lap_engine import StatsEngine
+
 def read_driver_details(filename):
     """Read driver details from a file."""
     drivers = {}
@@ -68,25 +74,28 @@ def get_top_fastest_drivers(fastest_laps, top_n=3):
     sorted_drivers = sorted(fastest_laps.items(), key=lambda x: x[1])  # Sort by fastest lap time
     return sorted_drivers[:top_n]
 
-def display_unique_data(drivers):
+def display_unique_data(drivers, lap_counts, slowest_laps):
     """Display unique data for each driver."""
     print("Unique Driver Data:")
-    for code, driver in drivers.items():
-        if "lap_times" in driver:
-            total_laps = len(driver["lap_times"])
-            slowest_lap = max(driver["lap_times"])
-            print(f"Driver: {driver['name']} (Car Number: {driver['car_number']}) - Team: {driver['team']}")
-            print(f"Total Laps Completed: {total_laps}")
-            print(f"Slowest Lap Time: {slowest_lap}")
-            print("-" * 40)
+    for code in drivers.codes():  # Driver file order, then codes only seen in lap files
+        if code not in lap_counts:
+            continue
+        driver = drivers.get_driver(code)
+        total_laps = lap_counts[code]
+        slowest_lap = slowest_laps[code]
+        print(f"Driver: {driver.name} (Car Number: {driver.car_number}) - Team: {driver.team}")
+        print(f"Total Laps Completed: {total_laps}")
+        print(f"Slowest Lap Time: {slowest_lap}")
+        print("-" * 40)
 
 def display_results(race_name, drivers, fastest_laps, averages):
     """Display the results for a given race."""
     print(f"Results for {race_name}:")
-    for code, driver in drivers.items():
-        name = driver["name"]
-        team = driver["team"]
-        car_number = driver["car_number"]
+    for code in drivers.codes():
+        driver = drivers.get_driver(code)
+        name = driver.name
+        team = driver.team
+        car_number = driver.car_number
         fastest_lap = fastest_laps.get(code, "N/A")
         average_lap = averages.get(code, "N/A")
         
@@ -99,11 +108,14 @@ def display_top_fastest_drivers(drivers, top_fastest):
     """Display the top fastest drivers."""
     print("Top 3 Fastest Drivers:")
     for rank, (code, lap_time) in enumerate(top_fastest, 1):
-        driver = drivers[code]
-        print(f"{rank}. Driver: {driver['name']} (Car Number: {driver['car_number']}) - Team: {driver['team']}")
+        driver = drivers.get_driver(code)
+        print(f"{rank}. Driver: {driver.name} (Car Number: {driver.car_number}) - Team: {driver.team}")
         print(f"Fastest Lap Time: {lap_time}")
         print("-" * 40)
 
+# The statistics this report shows; the engine computes nothing else
+REPORT_STATS = ("fastest", "average", "ranking", "lap_count", "slowest")
+
 def main():
     # File paths
     driver_file = r"C:\Users\Binay Ghimire\OneDrive - iTechno\Documents\TBC'\Level 4\Fundamentals of Computer Programming\Project_Work\Project 1\f1_drivers.txt"  # Full path to the driver file
@@ -113,27 +125,43 @@ def main():
         r"C:\Users\Binay Ghimire\OneDrive - iTechno\Documents\TBC'\Level 4\Fundamentals of Computer Programming\Project_Work\Project 1\lap_times_3.txt"   # Full path to lap time file 3
     ]
     
-    # Step 1: Read data from files
-    drivers = read_driver_details(driver_file)
-    race_names, lap_data = read_lap_times(lap_time_files)
+    profiler = StageProfiler(parse_profile_argument(sys.argv[1:]))  # --profile or --profile=FILE
+    
+    # Step 1: Read data from files (one partition per race, reusing $LAP_CACHE_DIR when set)
+    with profiler.stage("read") as record:
+        drivers = DriverRegistry(driver_file)
+        index = build_race_index(lap_time_files)
+        race_names = get_race_names(index)
+        record["lines"] = index["totals"]["count"]
     
     # Step 2: Merge data
-    drivers = merge_driver_and_lap_data(drivers, lap_data)
+    with profiler.stage("merge"):
+        drivers.register_codes(index["totals"]["drivers"])  # Codes missing from the driver file share UNKNOWN_DRIVER
     
-    # Step 3: Calculate stats
-    fastest_laps = calculate_fastest_laps(drivers)
-    averages = calculate_average_laps(drivers)
+    # Step 3: Calculate stats (only those in REPORT_STATS, read from the precomputed summaries)
+    with profiler.stage("stats"):
+        stats = StatsEngine(summary=index["totals"]).compute(REPORT_STATS)
+        fastest_laps = stats["fastest"]
+        averages = stats["average"]
     
     # Step 4: Display results
-    print(f"Races: {', '.join(race_names)}")
-    display_results(race_names[-1], drivers, fastest_laps, averages)  # Show stats for the last race
+    with profiler.stage("display_results"):
+        print(f"Races: {', '.join(race_names)}")
+        display_results("All Races", drivers, fastest_laps, averages)
+        if len(race_names) > 1:
+            latest = StatsEngine(summary=get_latest_race(index)["summary"])
+            display_results(f"{race_names[-1]} (latest race only)", drivers, latest.get("fastest"), latest.get("average"))
     
     # Step 5: Get and display top 3 fastest drivers
-    top_fastest = get_top_fastest_drivers(fastest_laps, top_n=3)
-    display_top_fastest_drivers(drivers, top_fastest)
+    with profiler.stage("top_fastest_drivers"):
+        top_fastest = stats["ranking"][:3]
+        display_top_fastest_drivers(drivers, top_fastest)
     
     # Step 6: Display unique data like slowest lap and total laps
-    display_unique_data(drivers)
+    with profiler.stage("display_unique_data"):
+        display_unique_data(drivers, stats["lap_count"], stats["slowest"])
+    
+    profiler.report()
 
 # Main execution
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import sys
+from final_task import read_driver_details
+from lap_cache import cached_parse_lap_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drivers (
+    driver_id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    team TEXT NOT NULL,
+    car_number INTEGER
+);
+CREATE TABLE IF NOT EXISTS races (
+    race_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    source TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS laps (
+    race_id INTEGER NOT NULL REFERENCES races (race_id),
+    driver_id INTEGER NOT NULL REFERENCES drivers (driver_id),
+    lap INTEGER NOT NULL,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS laps_driver_race ON laps (driver_id, race_id);
+CREATE INDEX IF NOT EXISTS laps_time ON laps (time);
+CREATE INDEX IF NOT EXISTS laps_race ON laps (race_id, driver_id);
+CREATE TABLE IF NOT EXISTS driver_race_summary (
+    driver_id INTEGER NOT NULL REFERENCES drivers (driver_id),
+    race_id INTEGER NOT NULL REFERENCES races (race_id),
+    laps INTEGER NOT NULL,
+    best REAL NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (driver_id, race_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS driver_race_summary_race ON driver_race_summary (race_id, best);
+"""
+
+def open_archive(filename):
+    """Open (or create) a season archive and make sure its tables and indexes exist."""
+    connection = sqlite3.connect(filename)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(SCHEMA)
+    return connection
+
+def ingest_drivers(connection, drivers):
+    """Insert or update drivers from read_driver_details, in one transaction."""
+    rows = [(code, details["name"], details["team"], details["car_number"]) for code, details in drivers.items()]
+    with connection:
+        connection.executemany(
+            "INSERT INTO drivers (code, name, team, car_number) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (code) DO UPDATE SET name = excluded.name, team = excluded.team, car_number = excluded.car_number",
+            rows)
+    return len(rows)
+
+def _get_driver_ids(connection, codes):
+    """Return {code: driver_id}, adding codes not in the drivers table as unknown drivers."""
+    driver_ids = dict(connection.execute("SELECT code, driver_id FROM drivers"))
+    missing = [(code, "Unknown", "Unknown") for code in codes if code not in driver_ids]
+    if missing:
+        connection.executemany("INSERT INTO drivers (code, name, team) VALUES (?, ?, ?)", missing)
+        driver_ids = dict(connection.execute("SELECT code, driver_id FROM drivers"))
+    return driver_ids
+
+def ingest_lap_file(connection, filename, cache_dir=None):
+    """Load one lap time file as a race, replacing its laps if the same file was ingested before.
+
+    Laps go in with one executemany. The race's per-driver summary rows are totalled while
+    the lap rows are generated, so the laps table is never read back, and are inserted in
+    the same transaction, so a query never sees a race without its summary.
+    """
+    race_name, codes, times = cached_parse_lap_file(filename, cache_dir)
+    codes = [code.decode("ascii") for code in (codes.tolist() if hasattr(codes, "tolist") else codes)]
+    times = times.tolist()
+    source = os.path.abspath(filename)
+    with connection:
+        old = connection.execute("SELECT race_id FROM races WHERE source = ?", (source,)).fetchone()
+        if old is not None:
+            race_id = old[0]  # Keep the race's id and place in the season
+            connection.execute("DELETE FROM driver_race_summary WHERE race_id = ?", old)
+            connection.execute("DELETE FROM laps WHERE race_id = ?", old)
+            connection.execute("UPDATE races SET name = ? WHERE race_id = ?", (race_name, race_id))
+        else:
+            race_id = connection.execute("INSERT INTO races (name, source) VALUES (?, ?)", (race_name, source)).lastrowid
+        driver_ids = _get_driver_ids(connection, set(codes))
+
+        summary = {}  # Driver id -> [laps, best, total] so far in this race
+        def rows():
+            for code, time in zip(codes, times):
+                driver_id = driver_ids[code]
+                totals = summary.get(driver_id)
+                if totals is None:
+                    totals = summary[driver_id] = [0, time, 0.0]
+                totals[0] += 1
+                if time < totals[1]:
+                    totals[1] = time
+                totals[2] += time
+                yield race_id, driver_id, totals[0], time
+
+        connection.executemany("INSERT INTO laps (race_id, driver_id, lap, time) VALUES (?, ?, ?, ?)", rows())
+        connection.executemany(
+            "INSERT INTO driver_race_summary (driver_id, race_id, laps, best, total) VALUES (?, ?, ?, ?, ?)",
+            [(driver_id, race_id, laps, best, total) for driver_id, (laps, best, total) in summary.items()])
+    return race_id
+
+def ingest_lap_files(connection, filenames, cache_dir=None):
+    """Ingest several lap time files, one transaction per race. Returns the race ids."""
+    return [ingest_lap_file(connection, filename, cache_dir) for filename in filenames]
+
+def get_races(connection):
+    """Return [(race_id, name)] in the order the races were ingested."""
+    return connection.execute("SELECT race_id, name FROM races ORDER BY race_id").fetchall()
+
+def get_driver_best_per_race(connection, code):
+    """Return [(race_id, race_name, best, laps)] for one driver, from the summary table."""
+    return connection.execute(
+        "SELECT r.race_id, r.name, s.best, s.laps FROM driver_race_summary s "
+        "JOIN drivers d ON d.driver_id = s.driver_id JOIN races r ON r.race_id = s.race_id "
+        "WHERE d.code = ? ORDER BY r.race_id", (code,)).fetchall()
+
+def get_driver_races(connection, code):
+    """Return [(race_id, race_name)] for every race the driver set a time in."""
+    return [(race_id, name) for race_id, name, _, _ in get_driver_best_per_race(connection, code)]
+
+def get_team_bests(connection, race_id=None):
+    """Return [(team, best, code)] fastest first: each team's best lap, in one race or the whole season."""
+    where = "WHERE s.race_id = ?" if race_id is not None else ""
+    params = (race_id,) if race_id is not None else ()
+    # SQLite returns the bare column (code) from the row that holds MIN(best)
+    return connection.execute(
+        f"SELECT d.team, MIN(s.best), d.code FROM driver_race_summary s "
+        f"JOIN drivers d ON d.driver_id = s.driver_id {where} GROUP BY d.team ORDER BY MIN(s.best)",
+        params).fetchall()
+
+def get_fastest_laps(connection, top_n=10):
+    """Return [(code, race_name, lap, time)] for the season's fastest laps, read off the lap time index."""
+    return connection.execute(
+        "SELECT d.code, r.name, l.lap, l.time FROM laps l "
+        "JOIN drivers d ON d.driver_id = l.driver_id JOIN races r ON r.race_id = l.race_id "
+        "ORDER BY l.time LIMIT ?", (top_n,)).fetchall()
+
+def main():
+    # Get command-line arguments
+    commands = ("ingest", "driver", "teams", "fastest")
+    if len(sys.argv) < 3 or sys.argv[2] not in commands:
+        print("Usage: python lap_archive.py <archive.db> ingest <driver_file> <lap_time_file> [<lap_time_file> ...]")
+        print("       python lap_archive.py <archive.db> driver <code> | teams | fastest [<count>]")
+        exit(1)
+
+    connection = open_archive(sys.argv[1])
+    command = sys.argv[2]
+    if command == "ingest":
+        if len(sys.argv) < 5:
+            print("Error: ingest needs a driver file and at least one lap time file!")
+            exit(1)
+        count = ingest_drivers(connection, read_driver_details(sys.argv[3]))
+        race_ids = ingest_lap_files(connection, sys.argv[4:])
+        print(f"Archived {count} drivers and {len(race_ids)} races in {sys.argv[1]}")
+    elif command == "driver":
+        if len(sys.argv) < 4:
+            print("Error: driver needs a driver code!")
+            exit(1)
+        for race_id, name, best, laps in get_driver_best_per_race(connection, sys.argv[3]):
+            print(f"Race {race_id} ({name}): best {best:.3f} over {laps} laps")
+    elif command == "teams":
+        for team, best, code in get_team_bests(connection):
+            print(f"{team}: {best:.3f} ({code})")
+    else:
+        top_n = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+        for code, name, lap, time in get_fastest_laps(connection, top_n):
+            print(f"{code} {time:.3f} (lap {lap}, {name})")
+    connection.close()
+
+# Main execution
+if __name__ == "__main__":
+    main()
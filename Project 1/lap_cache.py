@@ -0,0 +1,215 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from lap_fastparse import parse_lap_file
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Codes come back as a list of bytes instead
+
+CACHE_MAGIC = b"LAPC1\0"
+CACHE_SUFFIX = ".lapc"
+# magic, file size, mtime in ns, lap count, race name length, source path length, sampled hash, content hash
+CACHE_HEADER = struct.Struct("<6sQqQII16s16s")
+SAMPLE_BYTES = 64 * 1024
+DEFAULT_MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+def get_cache_dir(cache_dir=None):
+    """Return the cache directory to use, or None if caching is switched off."""
+    return cache_dir or os.environ.get("LAP_CACHE_DIR")
+
+def get_max_cache_bytes():
+    """Return the cap on the total size of the cache directory."""
+    return int(os.environ.get("LAP_CACHE_MAX_BYTES", DEFAULT_MAX_CACHE_BYTES))
+
+def _cache_path(filename, cache_dir):
+    """Return the cache file used for a lap time file."""
+    key = hashlib.blake2b(os.path.abspath(filename).encode(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, key + CACHE_SUFFIX)
+
+def _sampled_hash(file, size):
+    """Hash the first and last 64 KiB of a file. Cheap enough to check on every warm start."""
+    digest = hashlib.blake2b(digest_size=16)
+    file.seek(0)
+    digest.update(file.read(SAMPLE_BYTES))
+    if size > SAMPLE_BYTES:
+        file.seek(max(size - SAMPLE_BYTES, SAMPLE_BYTES))
+        digest.update(file.read(SAMPLE_BYTES))
+    return digest.digest()
+
+def _content_hash(file):
+    """Hash the whole file."""
+    digest = hashlib.blake2b(digest_size=16)
+    file.seek(0)
+    for block in iter(lambda: file.read(1024 * 1024), b""):
+        digest.update(block)
+    return digest.digest()
+
+def _read_header(data):
+    """Split a cache file into its header fields and payload offset, or return None if it is not one."""
+    if len(data) < CACHE_HEADER.size or not data.startswith(CACHE_MAGIC):
+        return None
+    fields = CACHE_HEADER.unpack_from(data)
+    offset = CACHE_HEADER.size
+    race_name = data[offset:offset + fields[4]].decode()
+    offset += fields[4]
+    source = data[offset:offset + fields[5]].decode()
+    offset += fields[5]
+    return {
+        "size": fields[1], "mtime_ns": fields[2], "laps": fields[3],
+        "sample_hash": fields[6], "content_hash": fields[7],
+        "race_name": race_name, "source": source, "offset": offset,
+    }
+
+def _write_cache(cache_file, filename, stat, sample_hash, content_hash, race_name, codes, times):
+    """Write the parsed codes and times for a lap time file to its cache file."""
+    if np is not None:
+        code_bytes = np.asarray(codes, dtype="S3").tobytes()
+        time_bytes = np.asarray(times, dtype=np.float64).tobytes()
+    else:
+        code_bytes = b"".join(codes)
+        time_bytes = array("d", times).tobytes()
+    name_bytes = race_name.encode()
+    source_bytes = os.path.abspath(filename).encode()
+    header = CACHE_HEADER.pack(CACHE_MAGIC, stat.st_size, stat.st_mtime_ns, len(times),
+                               len(name_bytes), len(source_bytes), sample_hash, content_hash)
+    # A temp name of our own, so workers caching the same file never write into each other's
+    descriptor, temp_file = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(cache_file))
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(header + name_bytes + source_bytes + code_bytes + time_bytes)
+        os.replace(temp_file, cache_file)  # Readers never see a half-written cache
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+def _load_payload(data, header):
+    """Return (codes, times) from a cache file's payload."""
+    laps = header["laps"]
+    start = header["offset"]
+    code_bytes = data[start:start + 3 * laps]
+    time_bytes = data[start + 3 * laps:start + 11 * laps]
+    if np is not None:
+        return np.frombuffer(code_bytes, dtype="S3"), np.frombuffer(time_bytes, dtype=np.float64)
+    times = array("d")
+    times.frombytes(time_bytes)
+    return [code_bytes[i:i + 3] for i in range(0, len(code_bytes), 3)], times
+
+def cached_parse_lap_file(filename, cache_dir=None):
+    """Like parse_lap_file, but reuse the compiled cache when the file has not changed."""
+    cache_dir = get_cache_dir(cache_dir)
+    if cache_dir is None:
+        return parse_lap_file(filename)
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        print(f"Error: File {filename} not found!")
+        exit(1)  # Exit if a lap time file is missing
+
+    cache_file = _cache_path(filename, cache_dir)
+    with open(filename, "rb") as file:
+        sample_hash = _sampled_hash(file, stat.st_size)
+        content_hash = None
+        try:
+            with open(cache_file, "rb") as cached:
+                data = cached.read()
+            header = _read_header(data)
+        except FileNotFoundError:
+            header = None
+        if header is not None and header["size"] == stat.st_size and header["sample_hash"] == sample_hash:
+            if header["mtime_ns"] == stat.st_mtime_ns:
+                try:
+                    os.utime(cache_file)  # Mark it used now, so pruning keeps it over colder files
+                except FileNotFoundError:
+                    pass  # Another worker pruned it after we read it
+                return (header["race_name"],) + _load_payload(data, header)
+            # Touched but maybe not changed: only the full hash can tell
+            content_hash = _content_hash(file)
+            if content_hash == header["content_hash"]:
+                codes, times = _load_payload(data, header)
+                _write_cache(cache_file, filename, stat, sample_hash, content_hash, header["race_name"], codes, times)
+                return header["race_name"], codes, times
+        if content_hash is None:
+            content_hash = _content_hash(file)
+
+    race_name, codes, times = parse_lap_file(filename)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_cache(cache_file, filename, stat, sample_hash, content_hash, race_name, codes, times)
+    prune_cache(cache_dir, keep=cache_file)
+    return race_name, codes, times
+
+def list_cache(cache_dir):
+    """Return details of every cache file, least recently used first.
+
+    A cache file's mtime is its last use: hits touch it and misses rewrite it. Access
+    times are not used, since relatime and noatime mounts do not update them on a read.
+    """
+    entries = []
+    if not os.path.isdir(cache_dir):
+        return entries
+    for name in os.listdir(cache_dir):
+        if not name.endswith(CACHE_SUFFIX):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            with open(path, "rb") as file:
+                header = _read_header(file.read(CACHE_HEADER.size + 4096))
+                stat = os.fstat(file.fileno())
+        except FileNotFoundError:
+            continue  # Pruned by another process while we were listing
+        entries.append({"path": path, "bytes": stat.st_size, "used": stat.st_mtime, "header": header})
+    entries.sort(key=lambda entry: entry["used"])
+    return entries
+
+def prune_cache(cache_dir, max_bytes=None, keep=None):
+    """Delete the least recently used cache files until the directory fits under max_bytes."""
+    if max_bytes is None:
+        max_bytes = get_max_cache_bytes()
+    entries = list_cache(cache_dir)
+    total = sum(entry["bytes"] for entry in entries)
+    removed = 0
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        if entry["path"] == keep:
+            continue
+        try:
+            os.remove(entry["path"])
+            removed += 1
+        except FileNotFoundError:
+            pass  # Another process pruned it first
+        total -= entry["bytes"]
+    return removed
+
+def main():
+    # Get command-line arguments
+    if len(sys.argv) < 2 or sys.argv[1] not in ("list", "purge"):
+        print("Usage: python lap_cache.py list|purge [<cache_dir>]")
+        exit(1)
+
+    cache_dir = get_cache_dir(sys.argv[2] if len(sys.argv) > 2 else None)
+    if cache_dir is None:
+        print("Error: No cache directory given and LAP_CACHE_DIR is not set!")
+        exit(1)
+
+    if sys.argv[1] == "purge":
+        removed = prune_cache(cache_dir, max_bytes=0)
+        print(f"Removed {removed} cache files from {cache_dir}")
+        return
+
+    entries = list_cache(cache_dir)
+    for entry in entries:
+        header = entry["header"]
+        if header is None:
+            print(f"{entry['path']}: not a lap cache file")
+            continue
+        print(f"{header['source']} ({header['race_name']}): {header['laps']} laps, {entry['bytes']} bytes")
+    print(f"Total: {len(entries)} files, {sum(entry['bytes'] for entry in entries)} bytes")
+
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import sys
+
+class Driver:
+    """One driver's details. Slotted, so each record is a small fixed-size object instead of a dict."""
+
+    __slots__ = ("driver_id", "code", "name", "team", "car_number")
+
+    def __init__(self, driver_id, code, name, team, car_number):
+        self.driver_id = driver_id
+        self.code = code
+        self.name = name
+        self.team = team
+        self.car_number = car_number
+
+    def __repr__(self):
+        return f"Driver({self.code!r}, {self.name!r}, {self.team!r}, {self.car_number!r})"
+
+# Every code missing from the driver file resolves to this one record
+UNKNOWN_DRIVER = Driver(None, None, "Unknown", "Unknown", None)
+
+class DriverRegistry:
+    """Drivers from the driver file with small integer ids. The file is read on first use."""
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self._loaded = filename is None
+        self._ids = {}       # Interned code -> id
+        self._codes = []     # Id -> code
+        self._records = []   # Id -> Driver, or UNKNOWN_DRIVER for codes not in the file
+        self._team_ids = {}  # Team -> ids of its drivers, in driver file order
+
+    def _load(self):
+        """Read the driver file the first time a driver is looked up."""
+        self._loaded = True
+        try:
+            with open(self.filename, "r") as file:
+                for line in file:
+                    car_number, code, name, team = line.strip().split(",")
+                    code = sys.intern(code)
+                    driver_id = self._ids.get(code)
+                    if driver_id is None:
+                        driver_id = self._add(code, None)
+                    self._records[driver_id] = Driver(driver_id, code, name, team, int(car_number))
+                    self._team_ids.setdefault(sys.intern(team), []).append(driver_id)
+        except FileNotFoundError:
+            print(f"Error: File {self.filename} not found!")
+            exit(1)  # Exit if the file is missing
+
+    def _add(self, code, record):
+        driver_id = len(self._codes)
+        self._ids[code] = driver_id
+        self._codes.append(code)
+        self._records.append(record)
+        return driver_id
+
+    def __len__(self):
+        if not self._loaded:
+            self._load()
+        return len(self._codes)
+
+    def get_id(self, code):
+        """Return the id for a code, giving codes not in the driver file an id of their own."""
+        if not self._loaded:
+            self._load()
+        driver_id = self._ids.get(code)
+        if driver_id is None:
+            driver_id = self._add(sys.intern(code), UNKNOWN_DRIVER)
+        return driver_id
+
+    def register_codes(self, codes):
+        """Make sure every code has an id, e.g. all codes seen in the lap files."""
+        for code in codes:
+            self.get_id(code)
+        return self
+
+    def get_code(self, driver_id):
+        """Return the three-letter code for an id."""
+        return self._codes[driver_id]
+
+    def get_driver(self, code):
+        """Return the Driver for a code, or the shared UNKNOWN_DRIVER."""
+        if not self._loaded:
+            self._load()
+        driver_id = self._ids.get(code)
+        return UNKNOWN_DRIVER if driver_id is None else self._records[driver_id]
+
+    def get_driver_by_id(self, driver_id):
+        """Return the Driver for an id."""
+        return self._records[driver_id]
+
+    def teams(self):
+        """Return every team in the driver file, in order of first appearance."""
+        if not self._loaded:
+            self._load()
+        return list(self._team_ids)
+
+    def get_team_ids(self, team):
+        """Return the ids of a team's drivers. The team index is built once, when the file is read."""
+        if not self._loaded:
+            self._load()
+        return self._team_ids.get(team, [])
+
+    def codes(self):
+        """Return every registered code: the driver file's order, then codes only seen in lap files."""
+        if not self._loaded:
+            self._load()
+        return list(self._codes)
@@ -0,0 +1,91 @@
+STATS = {}
+
+def register_stat(name, requires=()):
+    """Register a statistic. Its function gets the engine followed by the values of `requires`."""
+    def decorator(function):
+        STATS[name] = {"requires": requires, "function": function}
+        return function
+    return decorator
+
+class StatsEngine:
+    """Computes statistics on demand from lap data or a precomputed summary, once each.
+
+    A report asks for the stats it needs and only those, plus what they depend on, are
+    computed. Results are memoized, so "range" reuses "fastest" and "slowest" if another
+    report already asked for them.
+    """
+
+    def __init__(self, lap_data=None, summary=None):
+        if lap_data is None and summary is None:
+            raise ValueError("StatsEngine needs lap_data or a summary")
+        self.lap_data = lap_data   # {code: [times]} as returned by read_lap_times
+        self.summary = summary     # Aggregate summary from lap_stats, if the laps were already aggregated
+        self._values = {}
+
+    def get(self, name):
+        """Return one statistic, computing it and its dependencies the first time."""
+        if name not in self._values:
+            if name not in STATS:
+                raise KeyError(f"Unknown statistic {name!r}")
+            stat = STATS[name]
+            arguments = [self.get(required) for required in stat["requires"]]
+            self._values[name] = stat["function"](self, *arguments)
+        return self._values[name]
+
+    def compute(self, names):
+        """Return {name: value} for every statistic a report declares it needs."""
+        return {name: self.get(name) for name in names}
+
+    def get_top(self, top_n=3):
+        """Return [(code, fastest lap)] for the top N drivers."""
+        return self.get("ranking")[:top_n]
+
+    def _per_driver(self, field, function):
+        """Read a per-driver value from the summary if there is one, otherwise compute it from the laps."""
+        if self.summary is not None:
+            return {code: stats[field] for code, stats in self.summary["drivers"].items()}
+        return {code: function(times) for code, times in self.lap_data.items() if len(times) > 0}
+
+@register_stat("lap_count")
+def _lap_count(engine):
+    return engine._per_driver("count", len)
+
+@register_stat("fastest")
+def _fastest(engine):
+    return engine._per_driver("min", min)
+
+@register_stat("slowest")
+def _slowest(engine):
+    return engine._per_driver("max", max)
+
+@register_stat("total")
+def _total(engine):
+    return engine._per_driver("sum", sum)
+
+@register_stat("average", requires=("total", "lap_count"))
+def _average(engine, total, lap_count):
+    return {code: total[code] / lap_count[code] for code in total}
+
+@register_stat("overall_average", requires=("total", "lap_count"))
+def _overall_average(engine, total, lap_count):
+    total_laps = sum(lap_count.values())
+    return sum(total.values()) / total_laps if total_laps > 0 else 0
+
+@register_stat("range", requires=("fastest", "slowest"))
+def _range(engine, fastest, slowest):
+    return {code: slowest[code] - fastest[code] for code in fastest}
+
+@register_stat("ranking", requires=("fastest",))
+def _ranking(engine, fastest):
+    if engine.summary is not None:
+        # best_at says where each best lap was set, so on an exact tie the time found first stays ahead
+        drivers = engine.summary["drivers"]
+        return sorted(fastest.items(), key=lambda x: (x[1], drivers[x[0]]["best_at"]))
+    # Grouped lap data does not say when a time was set; sorted is stable, so dict order decides ties
+    return sorted(fastest.items(), key=lambda x: x[1])
+
+@register_stat("fastest_driver", requires=("fastest",))
+def _fastest_driver(engine, fastest):
+    if engine.summary is not None:
+        return engine.summary["fastest_code"]  # Knows which equal time was found first across files
+    return min(fastest, key=fastest.get) if fastest else None
@@ -0,0 +1,193 @@
+import mmap
+import sys
+import time
+from array import array
+from lap_millis import parse_millis
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Fall back to splitting the raw bytes in Python
+
+def _parse_bytes_numpy(buf, start, millis=False):
+    """Split codes and times out of the lap lines in buf[start:] in bulk."""
+    data = np.frombuffer(buf, dtype=np.uint8)[start:]
+    ends = np.flatnonzero(data == 10)  # Keep intp offsets: int32 would wrap past 2 GiB
+    if len(data) > 0 and data[-1] != 10:
+        ends = np.append(ends, len(data))  # Last line has no newline
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    ends -= data[np.maximum(ends - 1, 0)] == 13  # Drop the \r of CRLF line endings
+    keep = ends - starts > 0
+    if not keep.all():
+        starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return np.empty(0, dtype="S3"), np.empty(0, dtype=np.int32 if millis else np.float64)
+    if np.any(data[ends - 4] != 46):
+        raise ValueError("Lap time without three decimal places")
+
+    codes = np.empty((len(starts), 3), dtype=np.uint8)
+    for column in range(3):
+        codes[:, column] = data[starts + column]
+    codes = codes.view("S3").ravel()
+
+    # The time is "<digits>.ddd", so read it right to left as integer milliseconds
+    lap_millis = data[ends - 1].astype(np.int32) + data[ends - 2] * np.int32(10) + data[ends - 3] * np.int32(100) - 48 * 111
+    first_digit = starts + 3
+    scale = 1000
+    for offset in range(5, int((ends - starts).max()) - 2):
+        positions = ends - offset
+        digits = data[np.maximum(positions, first_digit)].astype(np.int32) - 48
+        digits *= positions >= first_digit  # Shorter times have no digit here
+        lap_millis += digits * scale
+        scale *= 10
+    return codes, lap_millis if millis else lap_millis / 1000.0
+
+def _parse_bytes_python(buf, start, millis=False):
+    """Split codes and times out of the lap lines in buf[start:] one token at a time."""
+    tokens = buf[start:].split()  # Lap lines never contain spaces
+    codes = [token[:3] for token in tokens]
+    if millis:
+        return codes, array("i", [parse_millis(token[3:]) for token in tokens])
+    times = array("d", [float(token[3:]) for token in tokens])
+    return codes, times
+
+def parse_lap_file(filename, millis=False):
+    """Memory-map a lap time file and return (race_name, codes, times) parsed from the raw bytes.
+
+    With millis=True the times are exact integer milliseconds (int32) instead of float seconds.
+    """
+    try:
+        with open(filename, "rb") as file:
+            try:
+                buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                buf = b""  # mmap refuses empty files
+    except FileNotFoundError:
+        print(f"Error: File {filename} not found!")
+        exit(1)  # Exit if a lap time file is missing
+
+    first_newline = buf.find(b"\n")
+    if first_newline == -1:
+        first_newline = len(buf)
+    race_name = bytes(buf[:first_newline]).decode().strip()  # First line is the race name
+    if np is not None:
+        codes, times = _parse_bytes_numpy(buf, first_newline + 1, millis)
+    else:
+        codes, times = _parse_bytes_python(buf, first_newline + 1, millis)
+    if isinstance(buf, mmap.mmap):
+        buf.close()
+    return race_name, codes, times
+
+def group_laps_by_driver(codes, times, lap_data=None, typecode="d"):
+    """Append parsed times to {code: array of times}, keeping drivers in order of first appearance.
+
+    Use typecode "i" for times parsed with millis=True.
+    """
+    if lap_data is None:
+        lap_data = {}
+    if np is not None and len(codes) > 0:
+        unique_codes, first_seen, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        groups = np.split(times[order], np.cumsum(np.bincount(inverse))[:-1])
+        for group_index in np.argsort(first_seen):
+            code = unique_codes[group_index].decode()
+            if code not in lap_data:
+                lap_data[code] = array(typecode)
+            lap_data[code].frombytes(groups[group_index].tobytes())
+    else:
+        for code, lap_time in zip(codes, times):
+            code = code.decode()
+            if code not in lap_data:
+                lap_data[code] = array(typecode)
+            lap_data[code].append(lap_time)
+    return lap_data
+
+def find_best_laps(codes, times, file_index, best_laps):
+    """Record each driver's fastest time and where it was first set, as {code: (time, (file, line))}.
+
+    Comparing the tuples puts an exact tie in the order the times were set, like best_at in lap_stats.
+    """
+    if np is not None and len(codes) > 0:
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        mins = np.full(len(unique_codes), times.max(), dtype=times.dtype)
+        np.minimum.at(mins, inverse, times)
+        best_at = np.full(len(unique_codes), len(times))
+        at_best = np.flatnonzero(times == mins[inverse])
+        np.minimum.at(best_at, inverse[at_best], at_best)
+        found = zip((code.decode() for code in unique_codes), mins.tolist(), best_at.tolist())
+    else:
+        found = {}
+        for line, (code, lap_time) in enumerate(zip(codes, times)):
+            code = code.decode()
+            if code not in found or lap_time < found[code][0]:
+                found[code] = (lap_time, line)
+        found = ((code, lap_time, line) for code, (lap_time, line) in found.items())
+    for code, lap_time, line in found:
+        best = (lap_time, (file_index, line))
+        if code not in best_laps or best < best_laps[code]:
+            best_laps[code] = best
+    return best_laps
+
+def iter_lap_files(filenames):
+    """Yield (code, time) for every lap in file order, e.g. for lap_stats.aggregate_laps."""
+    for filename in filenames:
+        _, codes, times = parse_lap_file(filename)
+        if np is not None:
+            codes, times = codes.tolist(), times.tolist()
+        for code, lap_time in zip(codes, times):
+            yield code.decode(), lap_time
+
+def read_lap_times_fast(filenames):
+    """Read lap times from multiple files, returning the same (race_names, lap_data) as read_lap_times."""
+    race_names = []
+    lap_data = {}
+    for filename in filenames:
+        race_name, codes, times = parse_lap_file(filename)
+        race_names.append(race_name)
+        group_laps_by_driver(codes, times, lap_data)
+    return race_names, lap_data
+
+def read_lap_times_millis(filenames, best_laps=None):
+    """Like read_lap_times_fast, but lap times are exact integer milliseconds in array("i") buffers.
+
+    Pass a dict as best_laps to have find_best_laps fill it in as the files are read.
+    """
+    race_names = []
+    lap_data = {}
+    for file_index, filename in enumerate(filenames):
+        race_name, codes, times = parse_lap_file(filename, millis=True)
+        race_names.append(race_name)
+        group_laps_by_driver(codes, times, lap_data, typecode="i")
+        if best_laps is not None:
+            find_best_laps(codes, times, file_index, best_laps)
+    return race_names, lap_data
+
+def main():
+    # Get command-line arguments
+    if len(sys.argv) < 2:
+        print("Usage: python lap_fastparse.py <lap_time_file1> [<lap_time_file2> ...]")
+        exit(1)
+
+    from final_task import read_lap_times
+
+    for filename in sys.argv[1:]:
+        started = time.perf_counter()
+        race_name, codes, times = parse_lap_file(filename)
+        fast_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        read_lap_times([filename])
+        slow_seconds = time.perf_counter() - started
+
+        lines = len(times)
+        print(f"{filename} ({race_name}): {lines} laps")
+        print(f"Fast parser:     {fast_seconds:.4f}s ({lines / max(fast_seconds, 1e-9):,.0f} lines/s)")
+        print(f"read_lap_times:  {slow_seconds:.4f}s ({lines / max(slow_seconds, 1e-9):,.0f} lines/s)")
+        print(f"Speed-up: {slow_seconds / max(fast_seconds, 1e-9):.1f}x")
+        print("-" * 40)
+
+# Main execution
+if __name__ == "__main__":
+    main()
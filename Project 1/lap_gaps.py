@@ -0,0 +1,117 @@
+import argparse
+from tabulate import tabulate
+from lap_drivers import DriverRegistry, UNKNOWN_DRIVER
+from lap_engine import StatsEngine
+from lap_index import build_race_index
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Fall back to nested lists built with comprehensions
+
+def build_gap_matrix(summary, drivers):
+    """Build the all-pairs gap matrices for one summary (a race or the totals).
+
+    Drivers are ordered by fastest lap. fastest_gap[i][j] and pace_gap[i][j] are how
+    much slower driver i was than driver j, by fastest lap and by average lap, so a
+    negative gap means i was quicker. team_mates[i][j] is True for two different
+    drivers in the same team; drivers missing from the driver file have no team-mates.
+    """
+    stats = StatsEngine(summary=summary).compute(("ranking", "average"))
+    codes = [code for code, _ in stats["ranking"]]
+    fastest = [time for _, time in stats["ranking"]]
+    average = [stats["average"][code] for code in codes]
+    teams = [drivers.get_driver(code).team for code in codes]
+    known = [drivers.get_driver(code) is not UNKNOWN_DRIVER for code in codes]
+
+    if np is not None:
+        fastest = np.array(fastest)
+        average = np.array(average)
+        teams = np.array(teams, dtype=object)
+        # Broadcasting a column against a row gives every pair at once
+        fastest_gap = fastest[:, None] - fastest[None, :]
+        pace_gap = average[:, None] - average[None, :]
+        known = np.array(known)
+        team_mates = (teams[:, None] == teams[None, :]) & ~np.eye(len(codes), dtype=bool) & known[:, None]
+    else:
+        fastest_gap = [[a - b for b in fastest] for a in fastest]
+        pace_gap = [[a - b for b in average] for a in average]
+        team_mates = [[i != j and known[i] and teams[i] == teams[j] for j in range(len(codes))] for i in range(len(codes))]
+    return {"codes": codes, "teams": teams, "fastest_gap": fastest_gap, "pace_gap": pace_gap, "team_mates": team_mates}
+
+def build_race_gap_matrices(index, drivers):
+    """Return [(race_name, matrix)] with one gap matrix per race in the index."""
+    return [(race["name"], build_gap_matrix(race["summary"], drivers)) for race in index["races"]]
+
+def get_team_mate_gaps(matrix):
+    """Return [(team, faster code, slower code, fastest lap gap, pace gap)] for each pair of team-mates."""
+    codes = matrix["codes"]
+    if np is not None:
+        # Drivers are ordered by fastest lap, so the upper triangle puts the quicker driver first
+        rows, columns = np.nonzero(np.triu(matrix["team_mates"]))
+        return [(matrix["teams"][i], codes[i], codes[j], -matrix["fastest_gap"][i, j], -matrix["pace_gap"][i, j])
+                for i, j in zip(rows.tolist(), columns.tolist())]
+    return [(matrix["teams"][i], codes[i], codes[j], -matrix["fastest_gap"][i][j], -matrix["pace_gap"][i][j])
+            for i in range(len(codes)) for j in range(i + 1, len(codes)) if matrix["team_mates"][i][j]]
+
+def export_gap_matrix(matrix, filename, field="fastest_gap"):
+    """Write one matrix as CSV with the driver codes as header row and first column, or as .npz with numpy."""
+    codes = matrix["codes"]
+    if np is not None and filename.endswith(".npz"):
+        np.savez(filename, codes=np.array(codes), teams=np.array(matrix["teams"], dtype=str),
+                 fastest_gap=matrix["fastest_gap"], pace_gap=matrix["pace_gap"], team_mates=matrix["team_mates"])
+        return
+    with open(filename, "w") as file:
+        file.write(",".join(["code", *codes]) + "\n")
+        if np is not None:
+            # One formatted block for the whole matrix, then the codes are stitched on row by row
+            values = np.char.mod("%.3f", matrix[field])
+            file.writelines(code + "," + ",".join(row) + "\n" for code, row in zip(codes, values.tolist()))
+        else:
+            file.writelines(code + "," + ",".join(f"{gap:.3f}" for gap in row) + "\n"
+                            for code, row in zip(codes, matrix[field]))
+
+def display_gap_matrix(title, matrix, field="fastest_gap"):
+    """Display one gap matrix as a table, row driver's gap to each column driver."""
+    rows = matrix[field].tolist() if np is not None else matrix[field]
+    print(f"{title}:")
+    print(tabulate([[code, *row] for code, row in zip(matrix["codes"], rows)],
+                   headers=["", *matrix["codes"]], floatfmt="+.3f"))
+    print("-" * 40)
+
+def display_team_mate_gaps(title, matrix):
+    """Display the gap between team-mates, quicker driver first."""
+    print(f"{title}:")
+    print(tabulate(get_team_mate_gaps(matrix), headers=["Team", "Quicker", "Slower", "Fastest Lap Gap", "Pace Gap"],
+                   floatfmt=".3f"))
+    print("-" * 40)
+
+def main():
+    # Get command-line arguments
+    parser = argparse.ArgumentParser(usage="python lap_gaps.py <driver_file> <lap_time_file1> [<lap_time_file2> ...] [--field fastest_gap|pace_gap] [--per-race] [--export FILE] [--jobs N] [--cache-dir DIR]")
+    parser.add_argument("driver_file")
+    parser.add_argument("lap_time_files", nargs="+")
+    parser.add_argument("--field", choices=("fastest_gap", "pace_gap"), default="fastest_gap", help="which gap to show and export")
+    parser.add_argument("--per-race", action="store_true", help="also show a matrix for each race")
+    parser.add_argument("--export", help="write the all-races matrix to a .csv file, or both all-races matrices to a .npz file")
+    parser.add_argument("--jobs", type=int, default=1, help="number of worker processes used to read the lap time files")
+    parser.add_argument("--cache-dir", help="keep parsed lap files here (defaults to $LAP_CACHE_DIR)")
+    args = parser.parse_args()
+
+    drivers = DriverRegistry(args.driver_file)
+    index = build_race_index(args.lap_time_files, jobs=args.jobs, cache_dir=args.cache_dir)
+    drivers.register_codes(index["totals"]["drivers"])
+
+    matrix = build_gap_matrix(index["totals"], drivers)
+    display_gap_matrix(f"All Races ({args.field})", matrix, args.field)
+    display_team_mate_gaps("All Races team-mates", matrix)
+    if args.per_race:
+        for race_id, (race_name, race_matrix) in enumerate(build_race_gap_matrices(index, drivers), 1):
+            display_gap_matrix(f"Race {race_id}: {race_name} ({args.field})", race_matrix, args.field)
+            display_team_mate_gaps(f"Race {race_id}: {race_name} team-mates", race_matrix)
+    if args.export:
+        export_gap_matrix(matrix, args.export, args.field)
+
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from lap_cache import cached_parse_lap_file
+from lap_fastparse import group_laps_by_driver
+from lap_parallel import aggregate_parsed_laps, map_lap_files
+from lap_stats import merge_summaries, new_summary
+
+def partition_lap_file(task):
+    """Parse one lap time file into a race partition: its laps by driver plus a precomputed summary."""
+    file_index, filename, cache_dir = task
+    race_name, codes, times = cached_parse_lap_file(filename, cache_dir)
+    return {
+        "race_id": file_index,
+        "name": race_name,
+        "laps": group_laps_by_driver(codes, times),
+        "summary": aggregate_parsed_laps(file_index, codes, times),
+    }
+
+def build_race_index(filenames, jobs=1, cache_dir=None):
+    """Build a race -> driver -> laps index, with one summary per race and cross-race totals."""
+    races = map_lap_files(partition_lap_file, filenames, jobs, cache_dir)
+    totals = new_summary()
+    for race in races:
+        totals = merge_summaries(totals, race["summary"])  # Merges summaries, never rescans laps
+    return {"races": races, "totals": totals}
+
+def get_race_names(index):
+    """Return the race names in the order the files were given."""
+    return [race["name"] for race in index["races"]]
+
+def find_races(index, race_name):
+    """Return the ids of every race with this name (sessions at one circuit share a name)."""
+    return [race["race_id"] for race in index["races"] if race["name"] == race_name]
+
+def get_race(index, race_id):
+    """Return one race partition."""
+    return index["races"][race_id]
+
+def get_latest_race(index):
+    """Return the partition of the last race given."""
+    return index["races"][-1]
+
+def get_race_stats(index, race_id):
+    """Return the precomputed summary for one race."""
+    return index["races"][race_id]["summary"]
+
+def get_driver_across_races(index, code):
+    """Return [(race_id, race_name, stats)] for every race the driver set a time in."""
+    results = []
+    for race in index["races"]:
+        stats = race["summary"]["drivers"].get(code)
+        if stats is not None:
+            results.append((race["race_id"], race["name"], stats))
+    return results
+
+def get_driver_laps(index, code, race_id):
+    """Return one driver's lap times in one race, or an empty list."""
+    return index["races"][race_id]["laps"].get(code, [])
@@ -0,0 +1,52 @@
+from bisect import bisect_left, insort
+
+class Leaderboard:
+    """Drivers ordered by personal best lap, kept sorted as laps arrive instead of re-sorted per refresh."""
+
+    def __init__(self):
+        self._entries = []   # Sorted (best time, order set, code) tuples
+        self._best = {}      # Code -> that driver's entry in _entries
+        self._order = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, code):
+        return code in self._best
+
+    def record_lap(self, code, time):
+        """Record a lap. Returns True if it is a new personal best (and so may change the order)."""
+        old_entry = self._best.get(code)
+        if old_entry is not None and time >= old_entry[0]:
+            return False
+        if old_entry is not None:
+            del self._entries[bisect_left(self._entries, old_entry)]
+        # The order counter breaks exact ties: whoever set the time first stays ahead
+        new_entry = (time, self._order, code)
+        self._order += 1
+        insort(self._entries, new_entry)
+        self._best[code] = new_entry
+        return True
+
+    def get_top(self, top_n=3):
+        """Return [(code, best time)] for the top N drivers."""
+        return [(code, time) for time, _, code in self._entries[:top_n]]
+
+    def get_rank(self, code):
+        """Return the driver's 1-based position, or None if they have no time yet."""
+        entry = self._best.get(code)
+        if entry is None:
+            return None
+        return bisect_left(self._entries, entry) + 1
+
+    def get_best(self, code):
+        """Return the driver's personal best, or None."""
+        entry = self._best.get(code)
+        return entry[0] if entry else None
+
+def build_leaderboard(fastest_laps):
+    """Build a leaderboard from {code: fastest lap}, treating dict order as the order the times were found."""
+    leaderboard = Leaderboard()
+    for code, time in fastest_laps.items():
+        leaderboard.record_lap(code, time)
+    return leaderboard
@@ -0,0 +1,74 @@
+import sys
+from tabulate import tabulate
+
+# Lap times always have exactly three decimals, so as whole milliseconds they are exact
+# integers: sums never drift and the spec's "exactly the same time" tie rule holds.
+# Times are only turned back into seconds by format_millis, when they are displayed.
+
+def parse_millis(text):
+    """Turn "103.844" (str or bytes) into 103844 without going through float()."""
+    if isinstance(text, bytes):
+        text = text.decode("ascii")
+    text = text.strip()
+    if len(text) > 4 and text[-4] == ".":
+        return int(text[:-4] + text[-3:])  # The usual case: exactly three decimals
+    whole, _, fraction = text.partition(".")
+    if len(fraction) > 3:
+        raise ValueError(f"Lap time {text!r} has more than three decimal places")
+    return int(whole or "0") * 1000 + int(fraction.ljust(3, "0"))
+
+def format_millis(millis):
+    """Format integer milliseconds as seconds with three decimals, e.g. 103844 -> "103.844"."""
+    return f"{millis // 1000}.{millis % 1000:03d}"
+
+def divide_millis(total, count):
+    """Return total / count rounded half up to a whole millisecond, using integers only."""
+    return (2 * total + count) // (2 * count)
+
+def calculate_fastest_laps_millis(lap_data):
+    """Calculate the fastest lap for each driver, in milliseconds."""
+    return {code: min(times) for code, times in lap_data.items() if len(times) > 0}
+
+def calculate_average_laps_millis(lap_data):
+    """Calculate the average lap time for each driver, rounded to the millisecond."""
+    return {code: divide_millis(sum(times), len(times)) for code, times in lap_data.items() if len(times) > 0}
+
+def calculate_overall_average_millis(lap_data):
+    """Calculate the overall average lap time across all drivers, rounded to the millisecond."""
+    total_laps = sum(len(times) for times in lap_data.values())
+    if total_laps == 0:
+        return 0
+    return divide_millis(sum(sum(times) for times in lap_data.values()), total_laps)
+
+def rank_fastest_laps(fastest_laps, best_laps=None):
+    """Return [(code, fastest lap)] fastest first.
+
+    With best_laps from read_lap_times_millis, an exact tie goes to the driver who set the
+    time first. Without it, ties keep the driver found first ahead.
+    """
+    if best_laps is not None:
+        return sorted(fastest_laps.items(), key=lambda x: best_laps[x[0]])
+    return sorted(fastest_laps.items(), key=lambda x: x[1])
+
+def main():
+    # Get command-line arguments
+    if len(sys.argv) < 2:
+        print("Usage: python lap_millis.py <lap_time_file1> [<lap_time_file2> ...]")
+        exit(1)
+
+    from lap_fastparse import read_lap_times_millis
+
+    best_laps = {}
+    race_names, lap_data = read_lap_times_millis(sys.argv[1:], best_laps)
+    averages = calculate_average_laps_millis(lap_data)
+    ranking = rank_fastest_laps(calculate_fastest_laps_millis(lap_data), best_laps)
+    table_data = [[position, code, format_millis(time), format_millis(averages[code])]
+                  for position, (code, time) in enumerate(ranking, 1)]
+    print(f"Races: {', '.join(race_names)}")
+    print(tabulate(table_data, headers=["Pos", "Code", "Fastest Lap", "Average Lap"], disable_numparse=True,
+                   colalign=("right", "left", "right", "right")))
+    print(f"Overall Average Lap Time: {format_millis(calculate_overall_average_millis(lap_data))}")
+
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+from lap_stats import aggregate_laps, new_summary
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Aggregate with the plain Python single pass instead
+
+def _aggregate_numpy(codes, times):
+    """Aggregate parsed codes and times per driver with NumPy group-by operations."""
+    unique_codes, first_seen, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    size = len(unique_codes)
+    counts = np.bincount(inverse, minlength=size)
+    sums = np.bincount(inverse, weights=times, minlength=size)
+    means = sums / counts
+    m2s = np.bincount(inverse, weights=(times - means[inverse]) ** 2, minlength=size)
+    mins = np.full(size, np.inf)
+    maxs = np.full(size, -np.inf)
+    np.minimum.at(mins, inverse, times)
+    np.maximum.at(maxs, inverse, times)
+    # Line position of each driver's first fastest lap, for the tie-break
+    best_at = np.full(size, len(times))
+    at_best = np.flatnonzero(times == mins[inverse])
+    np.minimum.at(best_at, inverse[at_best], at_best)
+
+    driver_stats = {}
+    for index in np.argsort(first_seen):  # Keep drivers in order of first appearance
+        driver_stats[unique_codes[index].decode()] = {
+            "count": int(counts[index]),
+            "sum": float(sums[index]),
+            "min": float(mins[index]),
+            "max": float(maxs[index]),
+            "mean": float(means[index]),
+            "m2": float(m2s[index]),
+            "best_at": int(best_at[index]),
+            "range": float(maxs[index] - mins[index]),
+        }
+    fastest = int(np.argmin(times))  # argmin returns the first of equal values
+    return {
+        "drivers": driver_stats,
+        "count": len(times),
+        "sum": float(sums.sum()),
+        "average": float(sums.sum()) / len(times),
+        "fastest_code": codes[fastest].decode(),
+        "fastest_time": float(times[fastest]),
+    }
+
+def aggregate_parsed_laps(file_index, codes, times):
+    """Aggregate one file's parsed codes and times into a partial summary."""
+    if len(times) == 0:
+        return new_summary()
+    if np is not None:
+        summary = _aggregate_numpy(codes, times)
+    else:
+        summary = aggregate_laps(zip((code.decode() for code in codes), times))
+    # Positions become (file, line) so partials from different files still order correctly
+    for stats in summary["drivers"].values():
+        stats["best_at"] = (file_index, stats["best_at"])
+    return summary
+
+def map_lap_files(worker, filenames, jobs=1, cache_dir=None):
+    """Run worker over (file_index, filename, cache_dir) for every file, in a process pool when jobs > 1."""
+    tasks = [(file_index, filename, cache_dir) for file_index, filename in enumerate(filenames)]
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(worker, tasks))
+    return [worker(task) for task in tasks]
@@ -0,0 +1,72 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class StageProfiler:
+    """Times the fixed steps of an analyser run: wall time, CPU time, lines per second and peak memory.
+
+    A disabled profiler hands out a shared no-op record, so leaving the calls in costs
+    next to nothing.
+    """
+
+    def __init__(self, target=None):
+        self.target = target   # None: off, "-": stderr, anything else: JSON file path
+        self.enabled = target is not None
+        self.records = []
+        self._unused = {}
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def _profiled_stage(self, name):
+        record = {"stage": name, "lines": None}
+        tracemalloc.reset_peak()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall_started
+            record["cpu_seconds"] = time.process_time() - cpu_started
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            if record["lines"] is not None and record["wall_seconds"] > 0:
+                record["lines_per_second"] = record["lines"] / record["wall_seconds"]
+            else:
+                record["lines_per_second"] = None
+            self.records.append(record)
+
+    @contextmanager
+    def _unprofiled_stage(self):
+        yield self._unused
+
+    def stage(self, name):
+        """Profile a block: `with profiler.stage("read") as record:`. Set record["lines"] to get lines/s."""
+        if not self.enabled:
+            return self._unprofiled_stage()
+        return self._profiled_stage(name)
+
+    def report(self):
+        """Write the collected records to stderr or to the JSON file."""
+        if not self.enabled:
+            return
+        tracemalloc.stop()
+        if self.target != "-":
+            with open(self.target, "w") as file:
+                json.dump(self.records, file, indent=2)
+            return
+        print("Profile:", file=sys.stderr)
+        for record in self.records:
+            rate = f", {record['lines_per_second']:,.0f} lines/s" if record["lines_per_second"] else ""
+            print(f"  {record['stage']}: wall {record['wall_seconds']:.4f}s, cpu {record['cpu_seconds']:.4f}s, "
+                  f"peak {record['peak_bytes'] / 1024:.1f} KiB{rate}", file=sys.stderr)
+
+def parse_profile_argument(args):
+    """Find --profile or --profile=FILE in a plain argument list, for scripts without argparse."""
+    for arg in args:
+        if arg == "--profile":
+            return "-"
+        if arg.startswith("--profile="):
+            return arg.split("=", 1)[1]
+    return None
@@ -0,0 +1,102 @@
+import csv
+import json
+import sys
+from tabulate import tabulate
+
+FORMATS = ("table", "jsonl", "csv")
+
+class ReportWriter:
+    """Writes report rows to a stream in batches, as a tabulate table, JSON Lines or CSV.
+
+    In the jsonl and csv formats rows are written as they are produced, a batch at a time,
+    so a report never has to be held in memory. The table format has to see every row to
+    size the columns, so it buffers one report at a time.
+
+    A csv stream has a single header, ["report", *columns], shared by every report; a
+    report fills its own columns and leaves the rest empty. Pass `columns` as the union of
+    every report's fields and headers, or the first report's columns are used and a later
+    report with other columns raises ValueError.
+    """
+
+    def __init__(self, fmt="table", stream=None, batch_size=500, columns=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+        self.fmt = fmt
+        self.stream = stream if stream is not None else sys.stdout
+        self.batch_size = batch_size
+        self._buffer = []
+        self._rows = 0
+        self._csv = csv.writer(self, lineterminator="\n") if fmt == "csv" else None
+        self._columns = list(columns) if columns is not None else None
+        self._header_written = False
+
+    def write(self, text):
+        """Buffer raw text. Lets the csv module write straight into the batch."""
+        self._buffer.append(text)
+
+    def flush(self):
+        """Write out everything buffered so far."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+        self._rows = 0
+        self.stream.flush()
+
+    def _row_added(self):
+        self._rows += 1
+        if self._rows >= self.batch_size:
+            self.flush()
+
+    def write_text(self, line):
+        """Write a free-text line. Only the human-readable table format shows these."""
+        if self.fmt == "table":
+            self._buffer.append(line + "\n")
+
+    def write_report(self, report, headers, rows, title=None, footer=(), fields=None):
+        """Write one report.
+
+        `fields` are report-level values (race name, overall average) added as leading
+        columns on every machine-readable row. In table format they are not repeated per
+        row, and `title` and `footer` lines are printed around the table instead.
+        """
+        fields = fields or {}
+        if self.fmt == "table":
+            if title is not None:
+                self.write_text(title)
+            self._buffer.append(tabulate(list(rows), headers=headers) + "\n")
+            for line in footer:
+                self.write_text(line)
+            self.flush()
+        elif self.fmt == "jsonl":
+            for row in rows:
+                record = {"report": report, **fields, **dict(zip(headers, row))}
+                self._buffer.append(json.dumps(record) + "\n")
+                self._row_added()
+        else:
+            positions = self._csv_positions([*fields, *headers])
+            template = [report] + [""] * len(self._columns)
+            for position, value in zip(positions, fields.values()):
+                template[position] = value
+            row_positions = positions[len(fields):]
+            for row in rows:
+                record = template.copy()
+                for position, value in zip(row_positions, row):
+                    record[position] = value
+                self._csv.writerow(record)
+                self._row_added()
+
+    def _csv_positions(self, names):
+        """Return where each named column goes in a csv record, writing the header the first time."""
+        if self._columns is None:
+            self._columns = names  # The first report fixes the schema
+        missing = [name for name in names if name not in self._columns]
+        if missing:
+            raise ValueError(f"Columns {', '.join(missing)} are not in the csv header; pass them in columns")
+        if not self._header_written:
+            self._csv.writerow(["report", *self._columns])
+            self._header_written = True
+        return [self._columns.index(name) + 1 for name in names]
+
+    def close(self):
+        """Flush whatever is left. Call once the last report is written."""
+        self.flush()
@@ -0,0 +1,110 @@
+from array import array
+from collections import deque
+
+class RollingWindow:
+    """Stats over a driver's last N laps, kept in a preallocated ring buffer with O(1) work per lap."""
+
+    def __init__(self, size=5):
+        if size < 1:
+            raise ValueError("Window size must be at least 1")
+        self.size = size
+        self._times = array("d", [0.0]) * size
+        self._next = 0        # Slot the next lap is written to
+        self._seen = 0        # Laps added since the window was last reset
+        self._shift = None    # Sums are kept relative to the first lap, which keeps the variance accurate
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._best = deque()  # (lap number, time) with increasing times: the front is the window's best
+
+    def __len__(self):
+        return min(self._seen, self.size)
+
+    def reset(self):
+        """Empty the window, e.g. at the start of a new stint."""
+        self._next = 0
+        self._seen = 0
+        self._shift = None
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._best.clear()
+
+    def add(self, time):
+        """Add a lap, pushing the oldest one out once the window is full."""
+        if self._shift is None:
+            self._shift = time
+        value = time - self._shift
+        if self._seen >= self.size:
+            old = self._times[self._next] - self._shift
+            self._sum -= old
+            self._sum_sq -= old * old
+        self._times[self._next] = time
+        self._sum += value
+        self._sum_sq += value * value
+
+        # Later laps that are at least as fast make older ones irrelevant to the best
+        while self._best and self._best[-1][1] >= time:
+            self._best.pop()
+        self._best.append((self._seen, time))
+        if self._best[0][0] <= self._seen - self.size:
+            self._best.popleft()
+
+        self._next = (self._next + 1) % self.size
+        self._seen += 1
+
+    def get_mean(self):
+        """Return the mean of the laps in the window, or None if it is empty."""
+        count = len(self)
+        if count == 0:
+            return None
+        return self._shift + self._sum / count
+
+    def get_best(self):
+        """Return the fastest lap in the window, or None if it is empty."""
+        return self._best[0][1] if self._best else None
+
+    def get_std_dev(self):
+        """Return the population standard deviation of the laps in the window, or None if it is empty."""
+        count = len(self)
+        if count == 0:
+            return None
+        mean = self._sum / count
+        return max(self._sum_sq / count - mean * mean, 0.0) ** 0.5
+
+    def get_laps(self):
+        """Return the laps in the window, oldest first."""
+        count = len(self)
+        start = (self._next - count) % self.size
+        return [self._times[(start + i) % self.size] for i in range(count)]
+
+class RollingTracker:
+    """One rolling window per driver, with optional stint detection."""
+
+    def __init__(self, size=5, stint_threshold=None):
+        self.size = size
+        # A lap slower than stint_threshold times the driver's best so far counts as an in/out lap
+        self.stint_threshold = stint_threshold
+        self.windows = {}
+        self.stints = {}
+        self._best = {}
+        self._pitting = set()  # Drivers whose last lap was an in/out lap
+
+    def add_lap(self, code, time):
+        """Add one lap for a driver. Returns that driver's window."""
+        window = self.windows.get(code)
+        if window is None:
+            window = self.windows[code] = RollingWindow(self.size)
+            self.stints[code] = 1
+        best = self._best.get(code)
+        if best is None or time < best:
+            self._best[code] = time
+        elif self.stint_threshold is not None and time > best * self.stint_threshold:
+            # Pit lap: the next stint starts with a fresh window. The in-lap and out-lap of
+            # one stop are both slow, so only the first slow lap after a flying lap counts.
+            if code not in self._pitting:
+                self._pitting.add(code)
+                window.reset()
+                self.stints[code] += 1
+            return window
+        self._pitting.discard(code)
+        window.add(time)
+        return window
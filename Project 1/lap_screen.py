@@ -0,0 +1,138 @@
+import sys
+import time
+from lap_drivers import DriverRegistry
+from lap_tail import new_tail_state, read_new_lap_times, render_live_results
+
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_TO_END_OF_LINE = "\x1b[K"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+MERGE_GAP = 6  # Unchanged characters between two changes that are cheaper to rewrite than to jump over
+
+def move_cursor(row, column):
+    """Return the escape that moves the cursor to a 0-based row and column."""
+    return f"\x1b[{row + 1};{column + 1}H"
+
+def diff_line(old, new):
+    """Return [(column, text)] spans of `new` that differ from `old`, with close spans merged.
+
+    Only the first len(new) columns are compared; clearing what is left of a longer old
+    line is up to the caller.
+    """
+    spans = []
+    width = len(new)
+    old = old[:width].ljust(width)
+    column = 0
+    while column < width:
+        if old[column] == new[column]:
+            column += 1
+            continue
+        start = column
+        end = column + 1
+        while end < width:
+            if old[end] != new[end]:
+                end += 1
+                continue
+            # Look ahead: only stop if the unchanged run is long enough to be worth a jump
+            gap = end
+            while gap < width and old[gap] == new[gap] and gap - end < MERGE_GAP:
+                gap += 1
+            if gap >= width or gap - end >= MERGE_GAP:
+                break
+            end = gap
+        spans.append((start, new[start:end]))
+        column = end
+    return spans
+
+class LiveScreen:
+    """A terminal view that redraws only the characters that changed since the last frame.
+
+    The last frame drawn is kept as a list of lines. A new frame is compared line by
+    line and only the changed spans are written, each after a cursor-addressing escape,
+    so a board where one lap time changed costs a few bytes instead of the whole table.
+    Frames are limited to `fps` per second; `ready()` says whether one may be drawn now.
+    """
+
+    def __init__(self, stream=None, fps=4.0):
+        self.stream = stream if stream is not None else sys.stdout
+        self.min_interval = 1.0 / fps if fps > 0 else 0.0
+        self._lines = None       # Last frame drawn, or None before the first one
+        self._last_draw = None
+        self.bytes_written = 0
+
+    def ready(self):
+        """Return True if enough time has passed since the last frame to draw another."""
+        return self._last_draw is None or time.monotonic() - self._last_draw >= self.min_interval
+
+    def draw(self, frame):
+        """Draw a frame (a string of lines), writing only what changed since the last one."""
+        lines = frame.split("\n")
+        if self._lines is None:
+            output = [HIDE_CURSOR, CLEAR_SCREEN, move_cursor(0, 0), "\r\n".join(lines)]
+        else:
+            output = []
+            for row, line in enumerate(lines):
+                old = self._lines[row] if row < len(self._lines) else ""
+                if line == old:
+                    continue
+                for column, text in diff_line(old, line):
+                    output.append(move_cursor(row, column) + text)
+                if len(line) < len(old):
+                    output.append(move_cursor(row, len(line)) + CLEAR_TO_END_OF_LINE)
+            for row in range(len(lines), len(self._lines)):
+                output.append(move_cursor(row, 0) + CLEAR_TO_END_OF_LINE)  # The frame got shorter
+        self._lines = lines
+        self._last_draw = time.monotonic()
+        if output:
+            text = "".join(output)
+            self.stream.write(text)
+            self.stream.flush()
+            self.bytes_written += len(text)
+
+    def close(self):
+        """Put the cursor below the last frame and show it again."""
+        rows = len(self._lines) if self._lines is not None else 0
+        self.stream.write(move_cursor(rows, 0) + SHOW_CURSOR)
+        self.stream.flush()
+
+def watch_lap_times(filename, drivers, fps=4.0, interval=0.1, window=5, screen=None, stint_threshold=None):
+    """Follow a lap time file and keep the live results on screen, at most `fps` redraws a second.
+
+    Laps are read every `interval` seconds; however many arrive, the table is only
+    rendered when a frame is due, so a burst of laps costs one redraw.
+    """
+    state = new_tail_state(filename, window, stint_threshold)
+    screen = screen if screen is not None else LiveScreen(fps=fps)
+    dirty = False
+    try:
+        while True:
+            if read_new_lap_times(state) > 0:
+                dirty = True
+            if dirty and screen.ready():
+                screen.draw(render_live_results(state, drivers))
+                dirty = False
+            time.sleep(interval)
+    finally:
+        screen.close()
+
+def main():
+    # Get command-line arguments
+    if len(sys.argv) < 3:
+        print("Usage: python lap_screen.py <driver_file> <lap_time_file> [<frames_per_second>] [<window_laps>] [<stint_threshold>]")
+        exit(1)
+
+    driver_file = sys.argv[1]
+    lap_time_file = sys.argv[2]
+    fps = float(sys.argv[3]) if len(sys.argv) > 3 else 4.0
+    window = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+    stint_threshold = float(sys.argv[5]) if len(sys.argv) > 5 else None  # e.g. 1.1: 10% off the best is a pit lap
+
+    drivers = DriverRegistry(driver_file)
+    try:
+        watch_lap_times(lap_time_file, drivers, fps=fps, window=window, stint_threshold=stint_threshold)
+    except KeyboardInterrupt:
+        print("Stopped following lap times.")
+
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import sys
+from lap_drivers import DriverRegistry
+from lap_tail import new_tail_state, read_new_lap_times
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+QUEUE_SIZE = 100  # Messages a client may fall behind by before it is resynced with a snapshot
+
+def get_ranks(leaderboard):
+    """Return {code: position} for every driver on the leaderboard."""
+    return {code: position for position, (code, _) in enumerate(leaderboard.get_top(len(leaderboard)), 1)}
+
+class LeaderboardServer:
+    """Follows a lap time file and pushes leaderboard changes to display clients as JSON lines.
+
+    A client gets one full snapshot when it connects and after that only deltas: new
+    personal bests and drivers whose position changed. A restarted timing file sends
+    every client a new snapshot. Each client has its own bounded
+    queue and sender task, so ingestion never waits on a socket. A client that lets its
+    queue fill up has its backlog replaced by a fresh snapshot instead.
+    """
+
+    def __init__(self, filename, drivers, interval=1.0):
+        self.state = new_tail_state(filename)
+        self.drivers = drivers
+        self.interval = interval
+        self.clients = set()   # One asyncio.Queue per connected client
+        self._handlers = set()  # The sender task of each connected client
+
+    def _driver_fields(self, code):
+        driver = self.drivers.get_driver(code)
+        return {"code": code, "name": driver.name, "team": driver.team}
+
+    def get_snapshot(self):
+        """Return the whole leaderboard as one message."""
+        rows = self.state["leaderboard"].get_top(len(self.state["leaderboard"]))
+        return {
+            "type": "snapshot",
+            "race": self.state["race_name"],
+            "leaderboard": [{"position": position, **self._driver_fields(code), "best": time}
+                            for position, (code, time) in enumerate(rows, 1)],
+        }
+
+    def poll(self):
+        """Read newly appended laps and return the message to broadcast, or None if nothing changed.
+
+        If the file was truncated or replaced, the tail state starts a new session with a new
+        leaderboard. A delta cannot remove drivers, so clients get a full snapshot instead.
+        """
+        leaderboard = self.state["leaderboard"]
+        old_ranks = get_ranks(leaderboard)
+        old_bests = {code: leaderboard.get_best(code) for code in old_ranks}
+        new_laps = read_new_lap_times(self.state)
+        if self.state["leaderboard"] is not leaderboard:
+            return self.get_snapshot()
+        if new_laps == 0:
+            return None
+
+        new_ranks = get_ranks(leaderboard)
+        bests = [{**self._driver_fields(code), "best": leaderboard.get_best(code)}
+                 for code in new_ranks if leaderboard.get_best(code) != old_bests.get(code)]
+        ranks = {code: position for code, position in new_ranks.items() if old_ranks.get(code) != position}
+        if not bests and not ranks:
+            return None
+        return {"type": "delta", "race": self.state["race_name"], "bests": bests, "ranks": ranks}
+
+    def broadcast(self, message):
+        """Queue a message for every client without waiting on any of them."""
+        line = (json.dumps(message) + "\n").encode()
+        for queue in self.clients:
+            try:
+                queue.put_nowait(line)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop its backlog and let a snapshot bring it up to date
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait((json.dumps(self.get_snapshot()) + "\n").encode())
+
+    async def ingest(self):
+        """Poll the lap time file forever, broadcasting each change."""
+        while True:
+            message = self.poll()
+            if message is not None:
+                self.broadcast(message)
+            await asyncio.sleep(self.interval)
+
+    async def handle_client(self, reader, writer):
+        """Send one client its snapshot, then whatever lands in its queue."""
+        queue = asyncio.Queue(QUEUE_SIZE)
+        queue.put_nowait((json.dumps(self.get_snapshot()) + "\n").encode())
+        self.clients.add(queue)
+        self._handlers.add(asyncio.current_task())
+        try:
+            while True:
+                line = await queue.get()
+                if line is None:
+                    break  # The server is shutting down
+                writer.write(line)
+                await writer.drain()
+        except ConnectionError:
+            pass  # The client went away; cancellation propagates after the cleanup below
+        finally:
+            self.clients.discard(queue)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def disconnect_clients(self, timeout=1.0):
+        """Ask every client's sender task to finish and wait briefly for them.
+
+        Tasks that end on their own are not left for asyncio.run to cancel at exit.
+        """
+        handlers = list(self._handlers)
+        for queue in self.clients:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        if handlers:
+            await asyncio.wait(handlers, timeout=timeout)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Accept display clients and ingest laps until cancelled."""
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Serving leaderboard for {self.state['filename']} on {host}:{port}")
+        async with server:
+            try:
+                await asyncio.gather(server.serve_forever(), self.ingest())
+            finally:
+                await self.disconnect_clients()
+
+def main():
+    # Get command-line arguments
+    if len(sys.argv) < 3:
+        print("Usage: python lap_server.py <driver_file> <lap_time_file> [<port>] [<interval_seconds>]")
+        exit(1)
+
+    driver_file = sys.argv[1]
+    lap_time_file = sys.argv[2]
+    port = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_PORT
+    interval = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+
+    server = LeaderboardServer(lap_time_file, DriverRegistry(driver_file), interval)
+    try:
+        asyncio.run(server.serve(DEFAULT_HOST, port))
+    except KeyboardInterrupt:
+        print("Stopped leaderboard server.")
+
+# Main execution
+if __name__ == "__main__":
+    main()
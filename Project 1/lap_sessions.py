@@ -0,0 +1,134 @@
+import os
+import queue
+import sys
+import threading
+from tabulate import tabulate
+from lap_drivers import DriverRegistry
+from lap_stats import merge_driver_stats, new_driver_stats, get_average
+from lap_tail import new_tail_state, read_new_lap_times
+
+class SessionFeed:
+    """One session's growing lap time file, followed by a thread of its own.
+
+    Each feed keeps its own incremental aggregates (the lap_tail state) behind its own
+    lock, so a burst of laps on one feed is processed by that feed's thread only and
+    never holds up the others.
+    """
+
+    def __init__(self, name, filename, window=5):
+        self.name = name
+        self.state = new_tail_state(filename, window)
+        self.lock = threading.Lock()
+        self._thread = None
+
+    def _run(self, updates, stop, interval):
+        while not stop.is_set():
+            with self.lock:
+                new_laps = read_new_lap_times(self.state, missing_ok=True)  # A later session's file may not exist yet
+            if new_laps > 0:
+                updates.put((self.name, new_laps))
+            stop.wait(interval)
+
+    def start(self, updates, stop, interval=1.0):
+        """Start following the file, reporting (session name, new laps) on the updates queue."""
+        self._thread = threading.Thread(target=self._run, args=(updates, stop, interval),
+                                        name=f"feed-{self.name}", daemon=True)
+        self._thread.start()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def get_stats(self):
+        """Return a copy of {code: driver stats} for this session, taken under the feed's lock."""
+        with self.lock:
+            return {code: dict(stats) for code, stats in self.state["stats"].items()}
+
+def get_weekend_stats(feeds):
+    """Merge every session's driver stats into one "best of weekend" set.
+
+    Returns {code: stats} where stats["session"] names the session of the driver's best
+    lap. On an exact tie the session listed first wins.
+    """
+    weekend = {}
+    for session_index, feed in enumerate(feeds):
+        for code, stats in feed.get_stats().items():
+            stats["best_at"] = (session_index, stats["best_at"])
+            stats["session"] = feed.name
+            merged = merge_driver_stats(weekend.get(code, new_driver_stats()), stats)
+            best_stats = stats if merged["best_at"] == stats["best_at"] else weekend[code]
+            merged["session"] = best_stats["session"]
+            weekend[code] = merged
+    return weekend
+
+def display_session(feed, drivers):
+    """Display one session's leaderboard."""
+    with feed.lock:
+        race_name = feed.state["race_name"]
+        rows = feed.state["leaderboard"].get_top(len(feed.state["leaderboard"]))
+        counts = {code: feed.state["stats"][code]["count"] for code, _ in rows}
+    table_data = [[position, code, drivers.get_driver(code).name, counts[code], time]
+                  for position, (code, time) in enumerate(rows, 1)]
+    print(f"{feed.name} ({race_name}):")
+    print(tabulate(table_data, headers=["Pos", "Code", "Name", "Laps", "Best"], floatfmt=".3f"))
+
+def display_weekend(feeds, drivers):
+    """Display the best of weekend table: each driver's best lap from any session, with every session's best."""
+    weekend = get_weekend_stats(feeds)
+    session_bests = [feed.get_stats() for feed in feeds]
+    table_data = []
+    ranking = sorted(weekend.items(), key=lambda x: (x[1]["min"], x[1]["best_at"]))
+    for position, (code, stats) in enumerate(ranking, 1):
+        driver = drivers.get_driver(code)
+        row = [position, code, driver.name, driver.team, stats["min"], stats["session"], stats["count"], get_average(stats)]
+        row.extend(bests[code]["min"] if code in bests else None for bests in session_bests)
+        table_data.append(row)
+    headers = ["Pos", "Code", "Name", "Team", "Best", "Session", "Laps", "Average", *(feed.name for feed in feeds)]
+    print("Best of weekend:")
+    print(tabulate(table_data, headers=headers, floatfmt=".3f", missingval="-"))
+    print("-" * 40)
+
+def watch_sessions(feeds, drivers, interval=1.0):
+    """Follow every feed at once and redisplay the changed sessions and the weekend table."""
+    updates = queue.Queue()
+    stop = threading.Event()
+    for feed in feeds:
+        feed.start(updates, stop, interval)
+    by_name = {feed.name: feed for feed in feeds}
+    try:
+        while True:
+            changed = {updates.get()[0]}
+            while not updates.empty():  # Fold everything that arrived meanwhile into one redisplay
+                changed.add(updates.get_nowait()[0])
+            for feed in feeds:
+                if feed.name in changed:
+                    display_session(by_name[feed.name], drivers)
+            display_weekend(feeds, drivers)
+    finally:
+        stop.set()
+        for feed in feeds:
+            feed.join()
+
+def parse_session_argument(arg):
+    """Split "FP1=fp1.txt" into ("FP1", "fp1.txt"). A bare path is named after its file."""
+    if "=" in arg:
+        name, filename = arg.split("=", 1)
+        return name, filename
+    return os.path.splitext(os.path.basename(arg))[0], arg
+
+def main():
+    # Get command-line arguments
+    if len(sys.argv) < 3:
+        print("Usage: python lap_sessions.py <driver_file> <session>=<lap_time_file> [<session>=<lap_time_file> ...]")
+        exit(1)
+
+    drivers = DriverRegistry(sys.argv[1])
+    feeds = [SessionFeed(*parse_session_argument(arg)) for arg in sys.argv[2:]]
+    try:
+        watch_sessions(feeds, drivers)
+    except KeyboardInterrupt:
+        print("Stopped following sessions.")
+
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+def new_driver_stats():
+    """Create an empty set of running totals for one driver."""
+    return {"count": 0, "sum": 0.0, "min": None, "max": None, "mean": 0.0, "m2": 0.0, "best_at": None}
+
+def update_driver_stats(stats, time, position=None):
+    """Add one lap time to a driver's running totals in O(1)."""
+    stats["count"] += 1
+    stats["sum"] += time
+    if stats["min"] is None or time < stats["min"]:
+        stats["min"] = time
+        stats["best_at"] = position  # Where the fastest lap was first found
+    if stats["max"] is None or time > stats["max"]:
+        stats["max"] = time
+    # Welford's method keeps the variance stable without storing every lap
+    delta = time - stats["mean"]
+    stats["mean"] += delta / stats["count"]
+    stats["m2"] += delta * (time - stats["mean"])
+    return stats
+
+def get_variance(stats):
+    """Return the population variance of a driver's lap times."""
+    if stats["count"] == 0:
+        return 0.0
+    return stats["m2"] / stats["count"]
+
+def get_average(stats):
+    """Return the average lap time from a driver's running totals."""
+    if stats["count"] == 0:
+        return 0.0
+    return stats["sum"] / stats["count"]
+
+def merge_driver_stats(stats, other):
+    """Combine two drivers' running totals into a new set, as if all laps had been seen together."""
+    if stats["count"] == 0:
+        return dict(other)
+    if other["count"] == 0:
+        return dict(stats)
+    merged = new_driver_stats()
+    count = stats["count"] + other["count"]
+    delta = other["mean"] - stats["mean"]
+    merged["count"] = count
+    merged["sum"] = stats["sum"] + other["sum"]
+    merged["mean"] = stats["mean"] + delta * other["count"] / count
+    merged["m2"] = stats["m2"] + other["m2"] + delta * delta * stats["count"] * other["count"] / count
+    merged["max"] = max(stats["max"], other["max"])
+    # On an exact tie the lap found first wins, whichever side it came from
+    if (stats["min"], stats["best_at"]) <= (other["min"], other["best_at"]):
+        merged["min"], merged["best_at"] = stats["min"], stats["best_at"]
+    else:
+        merged["min"], merged["best_at"] = other["min"], other["best_at"]
+    merged["range"] = merged["max"] - merged["min"]
+    return merged
+
+def merge_summaries(summary, other):
+    """Combine two aggregate summaries. Merging is associative, so partials can be combined in any grouping."""
+    driver_stats = dict(summary["drivers"])
+    for code, stats in other["drivers"].items():
+        if code in driver_stats:
+            driver_stats[code] = merge_driver_stats(driver_stats[code], stats)
+        else:
+            driver_stats[code] = stats
+    total_time = summary["sum"] + other["sum"]
+    total_laps = summary["count"] + other["count"]
+    fastest_code = None
+    fastest_key = None
+    for code, stats in driver_stats.items():
+        key = (stats["min"], stats["best_at"])
+        if fastest_key is None or key < fastest_key:
+            fastest_code = code
+            fastest_key = key
+    return {
+        "drivers": driver_stats,
+        "count": total_laps,
+        "sum": total_time,
+        "average": total_time / total_laps if total_laps > 0 else 0,
+        "fastest_code": fastest_code,
+        "fastest_time": fastest_key[0] if fastest_key else None,
+    }
+
+def new_summary():
+    """Create an empty aggregate summary, the identity for merge_summaries."""
+    return {"drivers": {}, "count": 0, "sum": 0.0, "average": 0, "fastest_code": None, "fastest_time": None}
+
+def iter_lap_data(lap_data):
+    """Yield (code, time) pairs from a {code: [times]} dict, driver by driver."""
+    for code, times in lap_data.items():
+        for time in times:
+            yield code, time
+
+def aggregate_laps(laps):
+    """Compute every per-driver and overall statistic in one pass over (code, time) pairs."""
+    driver_stats = {}
+    total_time = 0.0
+    total_laps = 0
+    fastest_code = None
+    fastest_time = None
+    for position, (code, time) in enumerate(laps):
+        stats = driver_stats.get(code)
+        if stats is None:
+            stats = driver_stats[code] = new_driver_stats()
+        update_driver_stats(stats, time, position)
+        total_time += time
+        total_laps += 1
+        # Strict < keeps the first driver found when two times are exactly equal
+        if fastest_time is None or time < fastest_time:
+            fastest_code = code
+            fastest_time = time
+    for stats in driver_stats.values():
+        stats["range"] = stats["max"] - stats["min"]
+    return {
+        "drivers": driver_stats,
+        "count": total_laps,
+        "sum": total_time,
+        "average": total_time / total_laps if total_laps > 0 else 0,
+        "fastest_code": fastest_code,
+        "fastest_time": fastest_time,
+    }
+
+def aggregate_lap_data(lap_data):
+    """Aggregate a {code: [times]} dict as returned by read_lap_times.
+
+    Grouping by driver loses the order the laps were set in, so here an exact tie between
+    drivers goes to the driver listed first. For the spec's first-found rule aggregate the
+    laps in file order instead: aggregate_laps(iter_lap_files(filenames)).
+    """
+    return aggregate_laps(iter_lap_data(lap_data))
+
+def get_fastest_laps(summary):
+    """Return {code: fastest lap} from an aggregate summary."""
+    return {code: stats["min"] for code, stats in summary["drivers"].items()}
+
+def get_slowest_laps(summary):
+    """Return {code: slowest lap} from an aggregate summary."""
+    return {code: stats["max"] for code, stats in summary["drivers"].items()}
+
+def get_average_laps(summary):
+    """Return {code: average lap} from an aggregate summary."""
+    return {code: get_average(stats) for code, stats in summary["drivers"].items()}
+
+def get_range_of_lap_times(summary):
+    """Return {code: slowest minus fastest lap} from an aggregate summary."""
+    return {code: stats["range"] for code, stats in summary["drivers"].items()}
+
+def get_lap_counts(summary):
+    """Return {code: number of laps} from an aggregate summary."""
+    return {code: stats["count"] for code, stats in summary["drivers"].items()}
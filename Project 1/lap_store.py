@@ -0,0 +1,185 @@
+from array import array
+from lap_cache import cached_parse_lap_file
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Fall back to plain Python loops over the arrays
+
+class LapStore:
+    """Columnar lap storage: one typed array per field instead of a list of floats per driver.
+
+    Times are kept as integer milliseconds in an array("i"), half the size of doubles and
+    exact, and only converted to seconds by the stat functions.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry  # Optional DriverRegistry, so lap ids match the ids used for rendering
+        self.driver_codes = []   # Driver id -> three-letter code
+        self.driver_ids = {}     # Three-letter code -> driver id
+        self.race_names = []     # Race id -> race name
+        self.driver_column = array("H")
+        self.race_column = array("H")
+        self.lap_column = array("I")   # Lap index for that driver within the race
+        self.time_column = array("i")  # Milliseconds
+        self._next_lap = {}
+
+    def __len__(self):
+        return len(self.time_column)
+
+    def add_race(self, race_name):
+        """Register a race and return its id."""
+        self.race_names.append(race_name)
+        return len(self.race_names) - 1
+
+    def get_driver_id(self, code):
+        """Return the id for a driver code, registering it the first time it is seen."""
+        driver_id = self.driver_ids.get(code)
+        if driver_id is None:
+            if self.registry is not None:
+                driver_id = self.registry.get_id(code)
+                while len(self.driver_codes) <= driver_id:
+                    self.driver_codes.append(self.registry.get_code(len(self.driver_codes)))
+            else:
+                driver_id = len(self.driver_codes)
+                self.driver_codes.append(code)
+            self.driver_ids[code] = driver_id
+        return driver_id
+
+    def add_lap(self, race_id, code, millis):
+        """Append one lap to the store, its time in integer milliseconds."""
+        driver_id = self.get_driver_id(code)
+        key = (race_id, driver_id)
+        lap_index = self._next_lap.get(key, 0)
+        self._next_lap[key] = lap_index + 1
+        self.driver_column.append(driver_id)
+        self.race_column.append(race_id)
+        self.lap_column.append(lap_index)
+        self.time_column.append(millis)
+
+    def nbytes(self):
+        """Return the number of bytes used by the lap columns."""
+        columns = [self.driver_column, self.race_column, self.lap_column, self.time_column]
+        return sum(len(column) * column.itemsize for column in columns)
+
+    def add_parsed_laps(self, race_id, codes, times):
+        """Append a whole parsed file at once: codes and float seconds as parse_lap_file returns them."""
+        if np is None or len(codes) == 0:
+            for code, time in zip(codes, times):
+                self.add_lap(race_id, code.decode(), round(time * 1000))
+            return
+        unique_codes, first_seen, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        id_map = np.zeros(len(unique_codes), dtype=np.uint16)
+        for group_index in np.argsort(first_seen):  # Register new codes in order of first appearance
+            id_map[group_index] = self.get_driver_id(unique_codes[group_index].decode())
+        driver_ids = id_map[inverse]
+
+        # Lap index: each lap's rank within its driver's laps, after any laps already stored for this race
+        order = np.argsort(inverse, kind="stable")
+        counts = np.bincount(inverse, minlength=len(unique_codes))
+        starts = np.cumsum(counts) - counts
+        lap_index = np.empty(len(codes), dtype=np.uint32)
+        lap_index[order] = np.arange(len(codes), dtype=np.uint32) - starts[inverse[order]]
+        for group_index, driver_id in enumerate(id_map.tolist()):
+            key = (race_id, driver_id)
+            base = self._next_lap.get(key, 0)
+            if base:
+                lap_index[inverse == group_index] += base
+            self._next_lap[key] = base + int(counts[group_index])
+
+        self.driver_column.frombytes(driver_ids.tobytes())
+        self.race_column.frombytes(np.full(len(codes), race_id, dtype=np.uint16).tobytes())
+        self.lap_column.frombytes(lap_index.tobytes())
+        self.time_column.frombytes(np.rint(np.asarray(times) * 1000).astype(np.int32).tobytes())
+
+    def lap_data(self):
+        """Return {code: array of times}, the same shape read_lap_times gives, for the existing stat functions."""
+        lap_data = {code: array("d") for code in self.driver_codes}
+        if np is not None and len(self) > 0:
+            ids = np.frombuffer(self.driver_column, dtype=np.uint16)
+            order = np.argsort(ids, kind="stable")
+            seconds = np.frombuffer(self.time_column, dtype=np.int32)[order] / 1000
+            counts = np.bincount(ids, minlength=len(self.driver_codes))
+            for code, times in zip(self.driver_codes, np.split(seconds, np.cumsum(counts)[:-1])):
+                lap_data[code].frombytes(times.tobytes())
+            return lap_data
+        for driver_id, millis in zip(self.driver_column, self.time_column):
+            lap_data[self.driver_codes[driver_id]].append(millis / 1000)
+        return lap_data
+
+def read_lap_store(filenames, registry=None, cache_dir=None):
+    """Read lap times from multiple files into a LapStore, parsing each file in bulk (through the cache if set)."""
+    store = LapStore(registry)
+    for filename in filenames:
+        race_name, codes, times = cached_parse_lap_file(filename, cache_dir)
+        store.add_parsed_laps(store.add_race(race_name), codes, times)
+    return store
+
+def summarize_store(store, race_id=None):
+    """Aggregate the store into a lap_stats summary in seconds, in one pass over the columns.
+
+    Pass race_id to summarize only that race's laps. best_at is the row a driver's fastest
+    lap was first stored at, so StatsEngine breaks exact ties the same way as for files.
+    """
+    size = len(store.driver_codes)
+    if np is not None and len(store) > 0:
+        ids = np.frombuffer(store.driver_column, dtype=np.uint16)
+        times = np.frombuffer(store.time_column, dtype=np.int32).astype(np.int64)
+        rows = np.arange(len(store))
+        if race_id is not None:
+            rows = np.flatnonzero(np.frombuffer(store.race_column, dtype=np.uint16) == race_id)
+            ids, times = ids[rows], times[rows]
+        counts = np.bincount(ids, minlength=size)
+        sums = np.zeros(size, dtype=np.int64)
+        mins = np.full(size, np.iinfo(np.int64).max)
+        maxs = np.full(size, np.iinfo(np.int64).min)
+        np.add.at(sums, ids, times)  # Integer sums stay exact, unlike bincount's float weights
+        np.minimum.at(mins, ids, times)
+        np.maximum.at(maxs, ids, times)
+        first_seen = np.full(size, len(store))
+        np.minimum.at(first_seen, ids, rows)
+        best_at = np.full(size, len(store))
+        at_best = np.flatnonzero(times == mins[ids])
+        np.minimum.at(best_at, ids[at_best], rows[at_best])
+        order = [driver_id for driver_id in np.argsort(first_seen, kind="stable").tolist() if counts[driver_id]]
+        columns = counts.tolist(), sums.tolist(), mins.tolist(), maxs.tolist(), best_at.tolist()
+    else:
+        counts, sums, mins, maxs, best_at = [0] * size, [0] * size, [None] * size, [None] * size, [None] * size
+        order = []
+        for row, (driver_id, race, millis) in enumerate(zip(store.driver_column, store.race_column, store.time_column)):
+            if race_id is not None and race != race_id:
+                continue
+            if counts[driver_id] == 0:
+                order.append(driver_id)
+            counts[driver_id] += 1
+            sums[driver_id] += millis
+            if mins[driver_id] is None or millis < mins[driver_id]:
+                mins[driver_id] = millis
+                best_at[driver_id] = row
+            if maxs[driver_id] is None or millis > maxs[driver_id]:
+                maxs[driver_id] = millis
+        columns = counts, sums, mins, maxs, best_at
+
+    counts, sums, mins, maxs, best_at = columns
+    driver_stats = {}
+    for driver_id in order:
+        driver_stats[store.driver_codes[driver_id]] = {
+            "count": counts[driver_id],
+            "sum": sums[driver_id] / 1000,
+            "min": mins[driver_id] / 1000,
+            "max": maxs[driver_id] / 1000,
+            "mean": sums[driver_id] / counts[driver_id] / 1000,
+            "best_at": best_at[driver_id],
+            "range": (maxs[driver_id] - mins[driver_id]) / 1000,
+        }
+    total_laps = sum(counts[driver_id] for driver_id in order)
+    total_millis = sum(sums[driver_id] for driver_id in order)
+    fastest = min(order, key=lambda driver_id: (mins[driver_id], best_at[driver_id]), default=None)
+    return {
+        "drivers": driver_stats,
+        "count": total_laps,
+        "sum": total_millis / 1000,
+        "average": total_millis / total_laps / 1000 if total_laps > 0 else 0,
+        "fastest_code": store.driver_codes[fastest] if fastest is not None else None,
+        "fastest_time": mins[fastest] / 1000 if fastest is not None else None,
+    }
@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+from tabulate import tabulate
+from lap_drivers import DriverRegistry
+from lap_leaderboard import Leaderboard
+from lap_rolling import RollingTracker
+from lap_stats import new_driver_stats, update_driver_stats, get_average, get_variance
+
+def new_tail_state(filename, window=5, stint_threshold=None):
+    """Create the state needed to follow a growing lap time file.
+
+    With a stint_threshold (e.g. 1.1) a lap that much slower than the driver's best counts
+    as a pit lap and starts a new stint; see RollingTracker.
+    """
+    return {
+        "filename": filename,
+        "offset": 0,         # Byte position we have read up to
+        "pending": b"",      # Partial line still being written by the timing system
+        "race_name": None,
+        "lines_read": 0,
+        "stats": {},
+        "leaderboard": Leaderboard(),
+        "rolling": RollingTracker(window, stint_threshold),  # Last-N laps per driver
+        "teams": None,       # Optional TeamStandings, updated with every lap
+    }
+
+def read_new_lap_times(state, missing_ok=False):
+    """Process only the lines appended since the last call. Returns the number of new laps.
+
+    With missing_ok a file that does not exist yet counts as no new laps instead of an error.
+    """
+    filename = state["filename"]
+    try:
+        size = os.path.getsize(filename)
+        if size < state["offset"]:
+            # The file was truncated or replaced, so start the session again
+            teams = state["teams"]
+            rolling = state["rolling"]
+            state.update(new_tail_state(filename, rolling.size, rolling.stint_threshold))
+            if teams is not None:
+                teams.reset()
+                state["teams"] = teams
+        with open(filename, "rb") as file:
+            file.seek(state["offset"])
+            chunk = file.read()
+    except FileNotFoundError:
+        if missing_ok:
+            return 0
+        print(f"Error: File {filename} not found!")
+        exit(1)  # Exit if the lap time file is missing
+    state["offset"] += len(chunk)
+
+    lines = (state["pending"] + chunk).split(b"\n")
+    state["pending"] = lines.pop()  # Last piece has no newline yet
+    new_laps = 0
+    for raw_line in lines:
+        line = raw_line.decode().strip()
+        state["lines_read"] += 1
+        if state["race_name"] is None:
+            state["race_name"] = line  # First line is the race name
+            continue
+        if not line:
+            continue
+        code = line[:3]
+        if code not in state["stats"]:
+            state["stats"][code] = new_driver_stats()
+        lap_time = float(line[3:])
+        update_driver_stats(state["stats"][code], lap_time, state["lines_read"])
+        state["leaderboard"].record_lap(code, lap_time)
+        state["rolling"].add_lap(code, lap_time)
+        if state["teams"] is not None:
+            state["teams"].record_lap(code, lap_time)
+        new_laps += 1
+    return new_laps
+
+def render_live_results(state, drivers):
+    """Return the running totals for every driver seen so far, in leaderboard order, as text."""
+    leaderboard = state["leaderboard"]
+    rolling = state["rolling"]
+    show_stints = rolling.stint_threshold is not None
+    table_data = []
+    for position, (code, _) in enumerate(leaderboard.get_top(len(leaderboard)), 1):
+        stats = state["stats"][code]
+        window = rolling.windows[code]
+        driver = drivers.get_driver(code)
+        row = [
+            position, code, driver.name, driver.team, stats["count"],
+            stats["min"], stats["max"], get_average(stats), get_variance(stats) ** 0.5,
+            window.get_mean(), window.get_best(), window.get_std_dev(),
+        ]
+        if show_stints:
+            row.append(rolling.stints[code])
+        table_data.append(row)
+    last_n = f"Last {rolling.size}"
+    headers = ["Pos", "Code", "Name", "Team", "Laps", "Fastest", "Slowest", "Average", "Std Dev",
+               f"{last_n} Avg", f"{last_n} Best", f"{last_n} Std Dev"]
+    if show_stints:
+        headers.append("Stint")
+    table = tabulate(table_data, headers=headers, floatfmt=".3f")
+    return f"Live results for {state['race_name']}:\n{table}\n{'-' * 40}"
+
+def display_live_results(state, drivers):
+    """Display the running totals for every driver seen so far, in leaderboard order."""
+    print(render_live_results(state, drivers))
+
+def follow_lap_times(filename, drivers, interval=1.0, window=5, stint_threshold=None):
+    """Keep reading a lap time file as it grows and redisplay after new laps arrive."""
+    state = new_tail_state(filename, window, stint_threshold)
+    while True:
+        if read_new_lap_times(state) > 0:
+            display_live_results(state, drivers)
+        time.sleep(interval)
+
+def main():
+    # Get command-line arguments
+    if len(sys.argv) < 3:
+        print("Usage: python lap_tail.py <driver_file> <lap_time_file> [<interval_seconds>] [<window_laps>] [<stint_threshold>]")
+        exit(1)
+
+    driver_file = sys.argv[1]
+    lap_time_file = sys.argv[2]
+    interval = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    window = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+    stint_threshold = float(sys.argv[5]) if len(sys.argv) > 5 else None  # e.g. 1.1: 10% off the best is a pit lap
+
+    drivers = DriverRegistry(driver_file)
+    try:
+        follow_lap_times(lap_time_file, drivers, interval, window, stint_threshold)
+    except KeyboardInterrupt:
+        print("Stopped following lap times.")
+
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import sys
+import time
+from tabulate import tabulate
+from lap_drivers import DriverRegistry, UNKNOWN_DRIVER
+from lap_index import build_race_index
+from lap_leaderboard import Leaderboard
+from lap_tail import new_tail_state, read_new_lap_times
+
+def new_team_stats(driver_ids):
+    """Create the running totals for one team."""
+    return {
+        "driver_ids": driver_ids,   # From the registry's team index, fixed at load
+        "count": 0,
+        "sum": 0.0,
+        "best": None,
+        "best_code": None,
+        "driver_bests": {},         # Driver id -> that driver's best lap
+    }
+
+class TeamStandings:
+    """Team results kept up to date lap by lap.
+
+    Teams and their drivers come from the registry's team index, built once when the
+    driver file is read. Each lap touches only its own team's totals and the team
+    leaderboard, so a live view costs O(1) per lap (plus a bisect over the teams for a
+    new team best) instead of regrouping every driver on each refresh. Codes missing
+    from the driver file have no team and are left out.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.reset()
+
+    def reset(self):
+        """Forget every lap, e.g. when a followed file is restarted."""
+        self.stats = {team: new_team_stats(self.registry.get_team_ids(team)) for team in self.registry.teams()}
+        self.leaderboard = Leaderboard()  # Teams ordered by their best lap
+
+    def _add(self, code, count, total, best):
+        driver_id = self.registry.get_id(code)
+        driver = self.registry.get_driver_by_id(driver_id)
+        if driver is UNKNOWN_DRIVER:
+            return False
+        stats = self.stats[driver.team]
+        stats["count"] += count
+        stats["sum"] += total
+        driver_best = stats["driver_bests"].get(driver_id)
+        if driver_best is None or best < driver_best:
+            stats["driver_bests"][driver_id] = best
+        if stats["best"] is not None and best >= stats["best"]:
+            return False
+        stats["best"] = best
+        stats["best_code"] = code
+        self.leaderboard.record_lap(driver.team, best)
+        return True
+
+    def record_lap(self, code, lap_time):
+        """Add one lap. Returns True if it is a new team best."""
+        return self._add(code, 1, lap_time, lap_time)
+
+    def record_driver_stats(self, code, stats):
+        """Add a driver's already aggregated laps (a lap_stats driver summary) in one step."""
+        return self._add(code, stats["count"], stats["sum"], stats["min"])
+
+    def get_mean(self, team):
+        """Return the team's mean lap time over every lap its drivers set, or None."""
+        stats = self.stats[team]
+        return stats["sum"] / stats["count"] if stats["count"] > 0 else None
+
+    def get_team_mate_gap(self, team):
+        """Return the gap from the team's fastest driver to its next fastest, or None with under two drivers."""
+        stats = self.stats[team]
+        bests = sorted(stats["driver_bests"][i] for i in stats["driver_ids"] if i in stats["driver_bests"])
+        return bests[1] - bests[0] if len(bests) > 1 else None
+
+    def get_standings(self):
+        """Return [(team, best, best code, mean pace, team-mate gap)] for teams with a time, fastest first."""
+        return [(team, best, self.stats[team]["best_code"], self.get_mean(team), self.get_team_mate_gap(team))
+                for team, best in self.leaderboard.get_top(len(self.leaderboard))]
+
+def build_team_standings(summary, registry):
+    """Build team standings from an aggregate summary, adding each driver's totals at once."""
+    standings = TeamStandings(registry)
+    for code, stats in summary["drivers"].items():
+        standings.record_driver_stats(code, stats)
+    return standings
+
+def display_team_standings(title, standings):
+    """Display the team standings table."""
+    table_data = [[position, *row] for position, row in enumerate(standings.get_standings(), 1)]
+    print(f"{title}:")
+    print(tabulate(table_data, headers=["Pos", "Team", "Best Lap", "Set By", "Mean Pace", "Team-mate Gap"],
+                   floatfmt=".3f", missingval="-"))
+    print("-" * 40)
+
+def follow_team_standings(filename, drivers, interval=1.0):
+    """Keep reading a lap time file as it grows and redisplay the team standings after new laps arrive."""
+    state = new_tail_state(filename)
+    state["teams"] = TeamStandings(drivers)  # read_new_lap_times feeds every lap to it
+    while True:
+        if read_new_lap_times(state) > 0:
+            display_team_standings(f"Team standings for {state['race_name']}", state["teams"])
+        time.sleep(interval)
+
+def main():
+    # Get command-line arguments
+    args = [arg for arg in sys.argv[1:] if arg != "--follow"]
+    if len(args) < 2:
+        print("Usage: python lap_teams.py <driver_file> <lap_time_file1> [<lap_time_file2> ...] [--follow]")
+        exit(1)
+
+    drivers = DriverRegistry(args[0])
+    if "--follow" in sys.argv:
+        try:
+            follow_team_standings(args[1], drivers)
+        except KeyboardInterrupt:
+            print("Stopped following lap times.")
+        return
+
+    index = build_race_index(args[1:])
+    display_team_standings("Team standings, all races", build_team_standings(index["totals"], drivers))
+
+# Main execution
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
-import sys
-from tabulate import tabulate
+import argparse
+from lap_drivers import DriverRegistry
+from lap_profile import StageProfiler
+from lap_render import FORMATS, ReportWriter
+from lap_index import build_race_index, get_race_names, get_latest_race
+from lap_engine import StatsEngine
 
 def read_driver_details(filename):
     """Read driver details from a file."""
@@ -75,61 +79,96 @@ def calculate_overall_average(lap_data):
         total_laps += len(times)
     return total_time / total_laps if total_laps > 0 else 0
 
-def display_sorted_fastest_times(fastest_laps, drivers):
+def display_sorted_fastest_times(fastest_laps, registry, writer=None):
     """Display the fastest laps sorted in descending order."""
+    writer = writer or ReportWriter()
     sorted_laps = sorted(fastest_laps.items(), key=lambda x: x[1])
-    print("Sorted Fastest Lap Times (from fastest to slowest):")
-    table_data = []
-    for code, time in sorted_laps:
-        driver = drivers[code]
-        table_data.append([code, driver["name"], driver["team"], driver["car_number"], time])
-    print(tabulate(table_data, headers=["Code", "Name", "Team", "Car Number", "Fastest Lap Time"]))
-    print("-" * 40)
-
-def display_results(race_name, drivers, fastest_laps, averages, overall_avg):
+
+    def table_row(code, time):
+        driver = registry.get_driver(code)  # Names and teams are joined in only as each row is rendered
+        return [code, driver.name, driver.team, driver.car_number, time]
+
+    table_data = (table_row(code, time) for code, time in sorted_laps)
+    writer.write_report("sorted_fastest_times", ["Code", "Name", "Team", "Car Number", "Fastest Lap Time"], table_data,
+                        title="Sorted Fastest Lap Times (from fastest to slowest):", footer=["-" * 40])
+    writer.flush()
+
+def display_results(race_name, registry, fastest_laps, averages, overall_avg, writer=None):
     """Display the results for a given race."""
-    print(f"Results for {race_name}:")
-    table_data = []
-    for code, driver in drivers.items():
-        name = driver["name"]
-        team = driver["team"]
-        car_number = driver["car_number"]
-        fastest_lap = fastest_laps.get(code, "N/A")
-        average_lap = averages.get(code, "N/A")
-        table_data.append([name, car_number, team, fastest_lap, average_lap])
+    writer = writer or ReportWriter()
+
+    def table_row(code):
+        driver = registry.get_driver(code)
+        return [driver.name, driver.car_number, driver.team, fastest_laps.get(code, "N/A"), averages.get(code, "N/A")]
+
+    table_data = (table_row(code) for code in registry.codes())
     
     # Display results in a table format
-    print(tabulate(table_data, headers=["Driver", "Car Number", "Team", "Fastest Lap Time", "Average Lap Time"]))
-    print(f"Overall Average Lap Time: {overall_avg:.3f}")
-    print("-" * 40)
+    writer.write_report("results", ["Driver", "Car Number", "Team", "Fastest Lap Time", "Average Lap Time"], table_data,
+                        title=f"Results for {race_name}:",
+                        footer=[f"Overall Average Lap Time: {overall_avg:.3f}", "-" * 40],
+                        fields={"Race": race_name, "Overall Average Lap Time": overall_avg})
+    writer.flush()
+
+# The statistics this report shows; the engine computes nothing else
+REPORT_STATS = ("fastest", "average", "overall_average")
+
+# Every column of both reports, so csv output has one header for the whole stream
+CSV_COLUMNS = ("Race", "Overall Average Lap Time", "Code", "Name", "Driver", "Car Number", "Team",
+               "Fastest Lap Time", "Average Lap Time")
 
 def main():
     # Get command-line arguments
-    if len(sys.argv) < 3:
-        print("Usage: python script.py <driver_file> <lap_time_file1> [<lap_time_file2> ...]")
-        exit(1)
+    parser = argparse.ArgumentParser(usage="python script.py <driver_file> <lap_time_file1> [<lap_time_file2> ...] [--jobs N] [--cache-dir DIR] [--format table|jsonl|csv] [--profile [FILE]]")
+    parser.add_argument("driver_file")
+    parser.add_argument("lap_time_files", nargs="+")
+    parser.add_argument("--jobs", type=int, default=1, help="number of worker processes used to read the lap time files")
+    parser.add_argument("--cache-dir", help="keep parsed lap files here (defaults to $LAP_CACHE_DIR)")
+    parser.add_argument("--format", choices=FORMATS, default="table", help="output format (jsonl and csv stream rows as they are produced)")
+    parser.add_argument("--profile", nargs="?", const="-", help="report time and memory per step to stderr, or to a JSON file")
+    args = parser.parse_args()
     
-    driver_file = sys.argv[1]
-    lap_time_files = sys.argv[2:]
+    driver_file = args.driver_file
+    lap_time_files = args.lap_time_files
     
-    # Step 1: Read data from files
-    drivers = read_driver_details(driver_file)
-    race_names, lap_data = read_lap_times(lap_time_files)
+    profiler = StageProfiler(args.profile)
+    
+    # Step 1: Read data from files (one partition per race, totals merged from their summaries)
+    with profiler.stage("read") as record:
+        drivers = DriverRegistry(driver_file)
+        index = build_race_index(lap_time_files, jobs=args.jobs, cache_dir=args.cache_dir)
+        race_names = get_race_names(index)
+        summary = index["totals"]
+        record["lines"] = summary["count"]
     
     # Step 2: Merge data
-    drivers = merge_driver_and_lap_data(drivers, lap_data)
+    with profiler.stage("merge"):
+        drivers.register_codes(summary["drivers"])
     
-    # Step 3: Calculate stats
-    fastest_laps = calculate_fastest_laps(drivers)
-    averages = calculate_average_laps(drivers)
-    overall_avg = calculate_overall_average(lap_data)
+    # Step 3: Calculate stats (only those in REPORT_STATS, read from the merged summary)
+    with profiler.stage("stats"):
+        stats = StatsEngine(summary=summary).compute(REPORT_STATS)
+        fastest_laps = stats["fastest"]
+        averages = stats["average"]
+        overall_avg = stats["overall_average"]
     
     # Step 4: Display sorted fastest laps
-    display_sorted_fastest_times(fastest_laps, drivers)
+    writer = ReportWriter(args.format, columns=CSV_COLUMNS)
+    with profiler.stage("display_sorted_fastest_times") as record:
+        display_sorted_fastest_times(fastest_laps, drivers, writer)
+        record["lines"] = len(fastest_laps)
     
     # Step 5: Display final results
-    print(f"Races: {', '.join(race_names)}")
-    display_results(race_names[-1], drivers, fastest_laps, averages, overall_avg)
+    with profiler.stage("display_results") as record:
+        writer.write_text(f"Races: {', '.join(race_names)}")
+        display_results("All Races", drivers, fastest_laps, averages, overall_avg, writer)
+        if len(race_names) > 1:
+            latest = StatsEngine(summary=get_latest_race(index)["summary"]).compute(REPORT_STATS)
+            display_results(f"{race_names[-1]} (latest race only)", drivers, latest["fastest"], latest["average"], latest["overall_average"], writer)
+        writer.close()
+        record["lines"] = len(drivers)
+    
+    profiler.report()
 
 # Main execution
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 import sys
 from tabulate import tabulate
+from lap_drivers import DriverRegistry
+from lap_engine import StatsEngine
+from lap_store import read_lap_store, summarize_store
 
 def read_driver_details(filename):
     """Read driver details from a file."""
@@ -78,10 +81,11 @@ def calculate_range_of_lap_times(drivers):
 def display_results(race_name, drivers, fastest_laps, averages, ranges):
     """Display the results in a table format."""
     table = []
-    for code, driver in drivers.items():
-        name = driver["name"]
-        team = driver["team"]
-        car_number = driver["car_number"]
+    for code in drivers.codes():
+        driver = drivers.get_driver(code)
+        name = driver.name
+        team = driver.team
+        car_number = driver.car_number
         fastest_lap = fastest_laps.get(code, "N/A")
         average_lap = averages.get(code, "N/A")
         lap_range = ranges.get(code, "N/A")
@@ -92,6 +96,9 @@ def display_results(race_name, drivers, fastest_laps, averages, ranges):
     print(f"Results for {race_name}:")
     print(tabulate(table, headers=headers, tablefmt="pretty", floatfmt=".3f"))
 
+# The statistics this report shows; the engine computes nothing else
+REPORT_STATS = ("fastest", "average", "range")
+
 def main():
     # File paths (can be updated or passed via command line arguments)
     if len(sys.argv) < 3:
@@ -101,27 +108,29 @@ def main():
     driver_file = sys.argv[1]
     lap_time_files = sys.argv[2:]
     
-    # Step 1: Read data from files
-    drivers = read_driver_details(driver_file)
-    race_names, lap_data = read_lap_times(lap_time_files)
-    
-    # Step 2: Merge data
-    drivers = merge_driver_and_lap_data(drivers, lap_data)
+    # Step 1: Read data from files into the columnar store (reuses $LAP_CACHE_DIR when set)
+    drivers = DriverRegistry(driver_file)
+    store = read_lap_store(lap_time_files, drivers)
+    race_names = store.race_names  # Codes missing from the driver file are registered as the store reads them
     
-    # Step 3: Calculate stats
-    fastest_laps = calculate_fastest_laps(drivers)
-    averages = calculate_average_laps(drivers)
-    ranges = calculate_range_of_lap_times(drivers)
+    # Step 2: Calculate stats (only those in REPORT_STATS, from one pass over the store's columns)
+    stats = StatsEngine(summary=summarize_store(store)).compute(REPORT_STATS)
+    fastest_laps = stats["fastest"]
+    averages = stats["average"]
+    ranges = stats["range"]
     
-    # Step 4: Sort the fastest laps in descending order
+    # Step 3: Sort the fastest laps in descending order
     sorted_drivers = sorted(fastest_laps.items(), key=lambda x: x[1])
     sorted_fastest_laps = {code: fastest_laps[code] for code, _ in sorted_drivers}
     sorted_averages = {code: averages[code] for code, _ in sorted_drivers}
     sorted_ranges = {code: ranges[code] for code, _ in sorted_drivers}
     
-    # Step 5: Display results
+    # Step 4: Display results
     print(f"Races: {', '.join(race_names)}")
-    display_results(race_names[-1], drivers, sorted_fastest_laps, sorted_averages, sorted_ranges)  # Show stats for the last race
+    display_results("All Races", drivers, sorted_fastest_laps, sorted_averages, sorted_ranges)
+    if len(race_names) > 1:
+        latest = StatsEngine(summary=summarize_store(store, race_id=len(race_names) - 1)).compute(REPORT_STATS)
+        display_results(f"{race_names[-1]} (latest race only)", drivers, latest["fastest"], latest["average"], latest["range"])
 
 # Main execution
 if __name__ == "__main__":
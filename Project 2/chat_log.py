@@ -0,0 +1,215 @@
+import atexit
+import csv
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import date
+
+LOG_HEADER = ["Timestamp", "User", "Message"]
+_STOP = object()  # Tells the writer thread to flush and finish
+
+class ChatLogWriter:
+    """Writes chat log rows from a background thread, in batches.
+
+    `log` only puts the rows on a queue, so handling a message never waits on the disk.
+    The thread keeps the log file open and writes a batch when `batch_size` records are
+    waiting or the oldest has waited `flush_interval` seconds. Before a batch it rotates
+    the file if it has reached `max_bytes` or was started on an earlier day; the old file
+    is renamed to e.g. chat_log.2024-12-27.1.csv. Queued rows are flushed by `close`,
+    which also runs at interpreter exit.
+
+    A batch that fails to write is reported on stderr and kept, and the thread tries it
+    again every `retry_interval` seconds. If the thread has died anyway, `log`, `flush`
+    and `close` write straight to the file instead. Use `get_log_writer` to share one
+    writer per log file.
+    """
+
+    def __init__(self, path, batch_size=50, flush_interval=1.0, max_bytes=1024 * 1024, rotate_daily=True,
+                 retry_interval=5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.retry_interval = retry_interval
+        self._queue = queue.Queue()
+        self._batch = []   # Records taken off the queue but not written yet
+        self._lock = threading.Lock()  # Held while writing directly, once the thread is gone
+        self._file = None
+        self._writer = None
+        self._day = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def log(self, rows):
+        """Queue rows to be written together, e.g. the user's message and the agent's reply."""
+        if self._closed:
+            raise ValueError("Chat log writer is closed")
+        if self._thread.is_alive():
+            self._queue.put(rows)
+        else:
+            self._write_directly([rows])
+
+    def flush(self):
+        """Write everything queued so far and wait for it, without stopping the thread."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(0.1):
+            if not self._thread.is_alive():
+                self._write_directly([])
+                return
+
+    def close(self):
+        """Write everything still queued, then stop the thread. Safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._batch or not self._queue.empty():
+            try:
+                self._write_directly([])
+            except OSError as error:
+                print(f"Error: {len(self._batch)} chat log entries for {self.path} were lost: {error}", file=sys.stderr)
+        self._close_file()
+
+    def _run(self):
+        deadline = None
+        retrying = False
+        while True:
+            # Only wait with a timeout while records are waiting, or an idle thread would spin
+            timeout = None if deadline is None or not self._batch else max(deadline - time.monotonic(), 0)
+            try:
+                record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None  # The oldest waiting record is due
+            if record is _STOP:
+                self._try_write()
+                self._close_file()
+                return
+            if isinstance(record, threading.Event):
+                retrying = not self._try_write()  # A flush: write now, even while retrying
+                deadline = time.monotonic() + self.retry_interval if retrying else None
+                record.set()
+                continue
+            if record is not None:
+                if not self._batch:
+                    deadline = time.monotonic() + self.flush_interval
+                self._batch.append(record)
+            if self._batch and ((len(self._batch) >= self.batch_size and not retrying) or time.monotonic() >= deadline):
+                retrying = not self._try_write()
+                deadline = time.monotonic() + self.retry_interval if retrying else None
+
+    def _try_write(self):
+        """Write the waiting batch. If the disk fails, report it and keep the batch for another try."""
+        while True:
+            try:
+                self._write_batch(self._batch)
+                return True
+            except OSError as error:
+                print(f"Error: Could not write the chat log {self.path}, will retry: {error}", file=sys.stderr)
+                self._close_file()  # Reopen it on the next try
+                return False
+            except Exception as error:  # A record the csv module cannot write will not get better on a retry
+                print(f"Error: Dropped a chat log entry for {self.path}: {error}", file=sys.stderr)
+                del self._batch[:1]
+
+    def _write_directly(self, records):
+        """Write without the thread: whatever it left behind, then records, in order."""
+        with self._lock:
+            while True:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(record, threading.Event):
+                    record.set()
+                elif record is not _STOP:
+                    self._batch.append(record)
+            self._batch.extend(records)
+            try:
+                self._write_batch(self._batch)
+            except OSError:
+                self._close_file()
+                raise  # The rest of the batch is kept for the next log or close
+            except Exception:
+                del self._batch[:1]  # A record the csv module cannot write is dropped, as in the thread
+                raise
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass  # Nothing more can be done with it
+            self._file = None
+
+    def _write_batch(self, batch):
+        """Write the records in batch, removing each from it once written, so a failed batch can be resumed."""
+        if not batch:
+            return
+        if self._file is None or self._needs_rotation():
+            self._open()
+        written = 0
+        try:
+            for rows in batch:
+                self._writer.writerows(rows)
+                written += 1
+        finally:
+            del batch[:written]
+        self._file.flush()
+
+    def _needs_rotation(self):
+        if self.rotate_daily and self._day != date.today():
+            return True
+        return self.max_bytes is not None and self._file.tell() >= self.max_bytes
+
+    def _open(self):
+        """Open the log for appending, moving a full or out of date one aside first."""
+        if self._file is not None:
+            self._close_file()
+            self._rotate(self._day)
+        elif os.path.exists(self.path):
+            started = date.fromtimestamp(os.path.getmtime(self.path))
+            if (self.rotate_daily and started != date.today()) or (
+                    self.max_bytes is not None and os.path.getsize(self.path) >= self.max_bytes):
+                self._rotate(started)
+        self._file = open(self.path, mode='a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._day = date.today()
+        if self._file.tell() == 0:
+            self._writer.writerow(LOG_HEADER)
+
+    def _rotate(self, day):
+        """Rename the current log to <name>.<day>.<n><ext>, using the first free n."""
+        stem, extension = os.path.splitext(self.path)
+        number = 1
+        while os.path.exists(f"{stem}.{day.isoformat()}.{number}{extension}"):
+            number += 1
+        os.replace(self.path, f"{stem}.{day.isoformat()}.{number}{extension}")
+
+_writers = {}  # Absolute log path -> its shared ChatLogWriter
+_writers_lock = threading.Lock()
+
+def get_log_writer(path, **options):
+    """Return the one writer for this log file, starting it the first time (or after it was closed).
+
+    Sessions share it, so they do not each start a thread and register an exit handler.
+    """
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer.closed:
+            writer = _writers[key] = ChatLogWriter(path, **options)
+    return writer
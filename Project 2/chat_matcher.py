@@ -0,0 +1,78 @@
+from collections import deque
+
+class KeywordMatcher:
+    """Finds which response keywords occur in a message, all of them in one pass.
+
+    An Aho-Corasick automaton is built once over every keyword (multi-word ones like
+    "student clubs" included), so matching a message costs O(len(message)) however many
+    keywords there are. Like the old `keyword in user_input` check, keywords match
+    anywhere in the message.
+
+    When several keywords match, the longest wins, since it is the more specific intent
+    ("summer courses" over "courses"). Keywords of equal length keep the order of the
+    responses file.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._goto = [{}]        # Node -> {character: next node}
+        self._fail = [0]         # Node -> node for the longest proper suffix in the trie
+        self._output = [None]    # Node -> index of the keyword ending here, if any
+        self._dict_link = [0]    # Node -> nearest suffix node with an output (0 for none)
+        for index, keyword in enumerate(self.keywords):
+            self._add(keyword, index)
+        self._build_links()
+        priority = sorted(range(len(self.keywords)), key=lambda index: (-len(self.keywords[index]), index))
+        self._rank = {index: rank for rank, index in enumerate(priority)}  # Smaller rank is higher priority
+
+    def _add(self, keyword, index):
+        node = 0
+        for character in keyword:
+            next_node = self._goto[node].get(character)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+                self._goto[node][character] = next_node
+            node = next_node
+        if self._output[node] is None:  # A repeated keyword keeps its first position
+            self._output[node] = index
+
+    def _build_links(self):
+        """Set the failure and output links breadth first, so a node's suffixes are done before it."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for character, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and character not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(character, 0)
+                self._fail[child] = fail
+                self._dict_link[child] = fail if self._output[fail] is not None else self._dict_link[fail]
+                queue.append(child)
+
+    def _matches(self, text):
+        """Yield the index of every keyword occurrence in text."""
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        node = 0
+        for character in text:
+            while node and character not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(character, 0)
+            match = node if output[node] is not None else dict_link[node]
+            while match:
+                yield output[match]
+                match = dict_link[match]
+
+    def find_all(self, text):
+        """Return every keyword found in text, highest priority first."""
+        found = set(self._matches(text))
+        return [self.keywords[index] for index in sorted(found, key=self._rank.get)]
+
+    def find_best(self, text):
+        """Return the highest priority keyword found in text, or None."""
+        best = min(self._matches(text), key=self._rank.get, default=None)
+        return self.keywords[best] if best is not None else None
@@ -0,0 +1,46 @@
+import re
+
+PLACEHOLDERS = ("name", "agent", "time")  # {name}: the user, {agent}: the agent's name, {time}: the time now
+PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+class TemplateError(ValueError):
+    """A response uses a placeholder the chatbot cannot fill."""
+
+class ResponseTemplate:
+    """A response split once into literal text and placeholders, so a reply is one join."""
+
+    __slots__ = ("text", "parts", "fields")
+
+    def __init__(self, text):
+        self.text = text
+        self.parts = []    # Literal strings, with None where a placeholder goes
+        self.fields = []   # (position in parts, placeholder name)
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            field = match.group(1)
+            if field not in PLACEHOLDERS:
+                raise TemplateError(f"Unknown placeholder {{{field}}} in response: {text!r}")
+            if match.start() > position:
+                self.parts.append(text[position:match.start()])
+            self.fields.append((len(self.parts), field))
+            self.parts.append(None)
+            position = match.end()
+        if position < len(text):
+            self.parts.append(text[position:])
+
+    def needs(self, field):
+        """Return True if the template uses this placeholder."""
+        return any(name == field for _, name in self.fields)
+
+    def render(self, values):
+        """Fill in the placeholders from {placeholder: value}."""
+        if not self.fields:
+            return self.text
+        parts = self.parts.copy()
+        for position, field in self.fields:
+            parts[position] = values[field]
+        return "".join(parts)
+
+def compile_responses(responses):
+    """Turn {keyword: [response text]} into {keyword: [ResponseTemplate]}, raising TemplateError for a bad one."""
+    return {keyword: [ResponseTemplate(text) for text in texts] for keyword, texts in responses.items()}
@@ -3,13 +3,16 @@ import json
 import os
 import csv
 from datetime import datetime  # Import the datetime module
+from chat_log import get_log_writer
+from chat_matcher import KeywordMatcher
+from chat_templates import TemplateError, compile_responses
 
 # Constants for file paths and agent names
 RESPONSE_FILE_PATH = r"C:\Users\Binay Ghimire\OneDrive - iTechno\Documents\TBC'\Level 4\Fundamentals of Computer Programming\Project_Work\Project 2\responses.json"
 AGENT_NAMES = ["Jordan", "Alex", "Taylor", "Chris"]
 LOG_FILE_PATH = r"C:\Users\Binay Ghimire\OneDrive - iTechno\Documents\TBC'\Level 4\Fundamentals of Computer Programming\Project_Work\Project 2\chat_log.csv"
 
-# Function to load responses from the JSON file
+# Function to load responses from the JSON file, compiled into templates
 def load_responses():
     if not os.path.exists(RESPONSE_FILE_PATH):
         print(f"Error: The file '{RESPONSE_FILE_PATH}' was not found. Please ensure the file exists.")
@@ -17,18 +20,31 @@ def load_responses():
 
     try:
         with open(RESPONSE_FILE_PATH, 'r') as file:
-            return json.load(file)
+            return compile_responses(json.load(file))  # Placeholders are checked here, not per reply
     except json.JSONDecodeError:
         print("Error: Failed to decode JSON data from the response file.")
         return {}
+    except TemplateError as error:
+        print(f"Error: {error}")
+        return {}
+
+# Function to build the keyword matcher once, after the responses are loaded
+def build_matcher(responses):
+    return KeywordMatcher(responses.keys())
 
 # Function to generate a response based on user input
-def respond_to_user(user_input, responses, user_name):
+def respond_to_user(user_input, responses, user_name, matcher=None, agent_name=""):
     user_input = user_input.lower()  # Normalize the input
+    if matcher is None:
+        matcher = build_matcher(responses)  # Callers in a loop should pass the one built at load
 
-    for keyword, random_responses in responses.items():
-        if keyword in user_input:
-            return random.choice(random_responses).replace("{name}", user_name)
+    keyword = matcher.find_best(user_input)  # One pass over the message, whatever the number of keywords
+    if keyword is not None:
+        template = random.choice(responses[keyword])
+        values = {"name": user_name, "agent": agent_name}
+        if template.needs("time"):
+            values["time"] = datetime.now().strftime("%H:%M")
+        return template.render(values)
 
     return "Sorry, I didn't quite catch that. Could you please rephrase?"
 
@@ -37,13 +53,18 @@ def select_agent():
     return random.choice(AGENT_NAMES)
 
 # Function to log the conversation to a CSV file with a timestamp
-def log_conversation(user_input, agent_response, user_name, agent_name):
+def log_conversation(user_input, agent_response, user_name, agent_name, log_writer=None):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Get the current time and format it
+    rows = [
+        [timestamp, user_name, user_input],  # Include timestamp, user message
+        [timestamp, agent_name, agent_response],  # Include timestamp, agent response
+        [],  # Add a break line between exchanges
+    ]
+    if log_writer is not None:
+        log_writer.log(rows)  # Queued; the writer thread does the disk I/O in batches
+        return
     with open(LOG_FILE_PATH, mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        writer.writerow([timestamp, user_name, user_input])  # Include timestamp, user message
-        writer.writerow([timestamp, agent_name, agent_response])  # Include timestamp, agent response
-        writer.writerow([])  # Add a break line between exchanges
+        csv.writer(file).writerows(rows)
 
 # Function to handle the user's chat interaction
 def start_chat():
@@ -61,31 +82,34 @@ def start_chat():
     if not responses:
         print("No responses available. Exiting the chatbot.")
         return
+    matcher = build_matcher(responses)
 
-    # Log header if file is empty
-    if not os.path.exists(LOG_FILE_PATH) or os.stat(LOG_FILE_PATH).st_size == 0:
-        with open(LOG_FILE_PATH, mode='a', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Timestamp", "User", "Message"])  # Added Timestamp column
-            writer.writerow([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), agent_name, f"Hello, {user_name}! I'm here to assist you."])
-            writer.writerow([])  # Add a break line
+    # Log the greeting (the writer adds the header to a new or rotated file)
+    log_writer = get_log_writer(LOG_FILE_PATH)  # Shared by every session, closed at exit
+    log_writer.log([
+        [datetime.now().strftime("%Y-%m-%d %H:%M:%S"), agent_name, f"Hello, {user_name}! I'm here to assist you."],
+        [],  # Add a break line
+    ])
 
     # Chat loop
-    while True:
-        user_input = input(f"{user_name}: ").strip()
-
-        # Exit the chat if the user says 'bye', 'exit', or 'quit'
-        if user_input in ["bye", "exit", "quit"]:
-            print(f"\nAgent {agent_name}: Goodbye, {user_name}! Have a great day!\n")
-            log_conversation(user_input, f"Goodbye, {user_name}! Have a great day!", user_name, agent_name)
-            break
-
-        # Generate and display the chatbot's response
-        agent_response = respond_to_user(user_input, responses, user_name)
-        print(f"\nAgent {agent_name}: {agent_response}\n")
-        
-        # Log the conversation to the CSV file
-        log_conversation(user_input, agent_response, user_name, agent_name)
+    try:
+        while True:
+            user_input = input(f"{user_name}: ").strip()
+
+            # Exit the chat if the user says 'bye', 'exit', or 'quit'
+            if user_input in ["bye", "exit", "quit"]:
+                print(f"\nAgent {agent_name}: Goodbye, {user_name}! Have a great day!\n")
+                log_conversation(user_input, f"Goodbye, {user_name}! Have a great day!", user_name, agent_name, log_writer)
+                break
+
+            # Generate and display the chatbot's response
+            agent_response = respond_to_user(user_input, responses, user_name, matcher, agent_name)
+            print(f"\nAgent {agent_name}: {agent_response}\n")
+
+            # Log the conversation to the CSV file
+            log_conversation(user_input, agent_response, user_name, agent_name, log_writer)
+    finally:
+        log_writer.flush()  # Write every queued exchange, even if the chat ends with an error
 
 # Run the chatbot
 if __name__ == "__main__":